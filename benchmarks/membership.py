@@ -0,0 +1,35 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+"""
+Per-message cost of the is_chat/is_user membership check.
+
+track_groups and track_users run the check on every message the bot sees.
+This compares the old list-backed lookup with the set-backed one used by
+MongoDB.chats/MongoDB.users, for a hit (known id) and a miss (new id).
+
+Usage: python benchmarks/membership.py [size ...]
+"""
+
+import random
+import sys
+import timeit
+
+
+def bench(size: int, number: int = 2000) -> None:
+    ids = random.sample(range(10**9, 10**10), size)
+    as_list, as_set = list(ids), set(ids)
+    hit, miss = ids[size // 2], -1
+
+    print(f"\n{size:,} ids")
+    for name, container in (("list", as_list), ("set", as_set)):
+        for label, key in (("hit", hit), ("miss", miss)):
+            total = timeit.timeit(lambda: key in container, number=number)
+            print(f"  {name:<4} {label:<4} {total / number * 1e9:>14,.0f} ns/message")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 100_000, 500_000]
+    for size in sizes:
+        bench(size)
@@ -0,0 +1,113 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+"""
+CPU cost of serving one source to a growing number of voice chats.
+
+"per chat" runs what play_media does for every chat: one ffmpeg decoding
+the source to 48 kHz stereo s16le each. "radio" runs what /radio does: one
+ffmpeg for the source, its 10 ms frames pushed through a ring buffer and
+handed to every listener. The listener here only takes the frame, so the
+figures are the decode and fan-out cost without the network.
+
+The source is a generated opus/webm track unless a file is given. Decoding
+runs as fast as possible; figures are CPU time per minute of audio.
+
+Usage: python benchmarks/radio.py [source] [listeners ...]
+"""
+
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import deque
+
+# 10 ms of 48 kHz stereo s16le, as in delta/core/radio.py.
+FRAME = 48000 * 2 * 2 // 100
+PCM_ARGS = ["-vn", "-f", "s16le", "-ac", "2", "-ar", "48000", "pipe:1"]
+
+
+def cpu() -> float:
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return children.ru_utime + children.ru_stime + time.process_time()
+
+
+def make_source(directory: str, seconds: int = 120) -> str:
+    path = os.path.join(directory, "source.webm")
+    subprocess.run(
+        ["ffmpeg", "-v", "error", "-f", "lavfi", "-i", f"sine=frequency=440:duration={seconds}",
+         "-ac", "2", "-c:a", "libopus", "-b:a", "128k", path],
+        check=True,
+    )
+    return path
+
+
+async def drain(process: asyncio.subprocess.Process) -> None:
+    try:
+        while True:
+            await process.stdout.readexactly(FRAME)
+    except asyncio.IncompleteReadError:
+        pass
+    await process.wait()
+
+
+async def spawn(source: str) -> asyncio.subprocess.Process:
+    return await asyncio.create_subprocess_exec(
+        "ffmpeg", "-nostdin", "-v", "error", "-i", source, *PCM_ARGS,
+        stdout=asyncio.subprocess.PIPE,
+    )
+
+
+async def per_chat(source: str, listeners: int) -> None:
+    processes = [await spawn(source) for _ in range(listeners)]
+    await asyncio.gather(*(drain(process) for process in processes))
+
+
+async def radio(source: str, listeners: int) -> None:
+    async def listener(frame: bytes) -> None:
+        return None
+
+    ring = deque(maxlen=50)
+    process = await spawn(source)
+    try:
+        while True:
+            ring.append(await process.stdout.readexactly(FRAME))
+            frame = ring[-1]
+            await asyncio.gather(*(listener(frame) for _ in range(listeners)))
+    except asyncio.IncompleteReadError:
+        pass
+    await process.wait()
+
+
+def duration(source: str) -> float:
+    out = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", source],
+        check=True, capture_output=True, text=True,
+    )
+    return float(out.stdout)
+
+
+async def main(source: str | None, counts: list[int]) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        source = source or make_source(tmp)
+        minutes = duration(source) / 60
+        print(f"\n{os.path.basename(source)}: {minutes:.1f} min, CPU ms per audio minute")
+        print(f"  {'chats':>6} {'per chat':>12} {'radio':>12}")
+        for count in counts:
+            row = []
+            for mode in (per_chat, radio):
+                start = cpu()
+                await mode(source, count)
+                row.append((cpu() - start) / minutes * 1000)
+            print(f"  {count:>6} {row[0]:>12,.0f} {row[1]:>12,.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        sys.argv[1] if len(sys.argv) > 1 and not sys.argv[1].isdigit() else None,
+        [int(arg) for arg in sys.argv[1:] if arg.isdigit()] or [1, 5, 10, 25, 50],
+    ))
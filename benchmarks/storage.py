@@ -0,0 +1,98 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+"""
+Per-operation latency of the storage backends behind MongoDB.
+
+Runs the bot's hot database operations (settings read/write, stat counter,
+playlist push, leaderboard read, buffered stats flush) against the embedded
+SQLite backend and, when MONGO_URL is set and motor is installed, against
+MongoDB. Both use a scratch database that is dropped afterwards.
+
+Usage: MONGO_URL=mongodb://... python benchmarks/storage.py [iterations]
+"""
+
+import asyncio
+import importlib.util
+import os
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+from pymongo import UpdateOne
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def load_sqlite():
+    # Load the module directly, importing the delta package would boot the bot.
+    spec = importlib.util.spec_from_file_location("delta_sqlite", ROOT / "delta" / "core" / "sqlite.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def operations(db) -> dict:
+    return {
+        "settings read": lambda i: db.chats.find_one({"_id": -(i % 500)}),
+        "settings write": lambda i: db.chats.update_one(
+            {"_id": -(i % 500)}, {"$set": {"loop_mode": "normal"}}, upsert=True
+        ),
+        "stat counter": lambda i: db.stats.update_one(
+            {"_id": f"track{i % 200}"}, {"$inc": {"count": 1}, "$set": {"title": "t"}}, upsert=True
+        ),
+        "playlist push": lambda i: db.users.update_one(
+            {"_id": i % 500}, {"$push": {"playlist": {"track_id": str(i), "title": "t"}}}, upsert=True
+        ),
+        "top users": lambda i: db.user_plays.find().sort("count", -1).limit(10).to_list(length=None),
+        "stats flush (200)": lambda i: db.user_plays.bulk_write(
+            [UpdateOne({"_id": (i * 200 + j) % 5000}, {"$inc": {"count": 1}}, upsert=True) for j in range(200)],
+            ordered=False,
+        ),
+    }
+
+
+async def bench(name: str, db, n: int) -> None:
+    await db.user_plays.create_index([("count", -1)])
+    print(f"\n{name}")
+    for label, op in operations(db).items():
+        timings = []
+        for i in range(n):
+            start = perf_counter()
+            await op(i)
+            timings.append((perf_counter() - start) * 1e6)
+        timings.sort()
+        print(
+            f"  {label:<18} mean {statistics.mean(timings):>9,.0f} us"
+            f"  p50 {timings[len(timings) // 2]:>9,.0f} us"
+            f"  p99 {timings[int(len(timings) * 0.99)]:>9,.0f} us"
+        )
+
+
+async def main(n: int) -> None:
+    sqlite = load_sqlite()
+    with tempfile.TemporaryDirectory() as tmp:
+        client = sqlite.SQLiteClient(os.path.join(tmp, "bench.db"))
+        await bench("sqlite (WAL)", client["bench"], n)
+        await client.close()
+
+    url = os.getenv("MONGO_URL")
+    if not url:
+        print("\nmongo: skipped, set MONGO_URL to compare")
+        return
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(url)
+    db = client["delta_storage_bench"]
+    try:
+        await bench("mongo (motor)", db, n)
+    finally:
+        await client.drop_database("delta_storage_bench")
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
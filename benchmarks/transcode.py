@@ -0,0 +1,110 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+"""
+CPU cost per call of playing a track with and without the raw audio cache.
+
+Without the cache every call runs what MediaStream asks ntgcalls for: an
+ffprobe when the stream starts, then an ffmpeg decoding and resampling the
+source to 48 kHz stereo s16le for the whole track. With the cache the call
+reads the already decoded file in 10 ms frames.
+
+The source is a generated opus/webm track unless a file is given. Both sides
+are run as fast as possible; the figures are CPU time per minute of audio,
+which is what a call costs whatever the playback speed.
+
+Usage: python benchmarks/transcode.py [source] [calls]
+"""
+
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+# 10 ms of 48 kHz stereo s16le, the frame size ntgcalls reads.
+FRAME = 48000 * 2 * 2 // 100
+PCM_ARGS = ["-f", "s16le", "-ac", "2", "-ar", "48000"]
+
+
+def children_cpu() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def make_source(directory: str, seconds: int = 240) -> str:
+    path = os.path.join(directory, "source.webm")
+    subprocess.run(
+        ["ffmpeg", "-v", "error", "-f", "lavfi", "-i", f"sine=frequency=440:duration={seconds}",
+         "-ac", "2", "-c:a", "libopus", "-b:a", "128k", path],
+        check=True,
+    )
+    return path
+
+
+def duration(source: str) -> float:
+    out = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", source],
+        check=True, capture_output=True, text=True,
+    )
+    return float(out.stdout)
+
+
+def ffmpeg_call(source: str) -> float:
+    """CPU seconds of one call decoding `source` the way MediaStream does."""
+    start_children, start_self = children_cpu(), time.process_time()
+    subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "stream=codec_type", "-show_format",
+         "-of", "json", source],
+        check=True, capture_output=True,
+    )
+    process = subprocess.Popen(
+        ["ffmpeg", "-nostdin", "-i", source, "-v", "quiet", *PCM_ARGS, "pipe:1"],
+        stdout=subprocess.PIPE,
+    )
+    while process.stdout.read(FRAME):
+        pass
+    process.wait()
+    return children_cpu() - start_children + time.process_time() - start_self
+
+
+def raw_call(path: str) -> float:
+    """CPU seconds of one call reading the pre-transcoded file."""
+    start = time.process_time()
+    with open(path, "rb", buffering=0) as f:
+        while f.read(FRAME):
+            pass
+    return time.process_time() - start
+
+
+def main(source: str | None, calls: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        source = source or make_source(tmp)
+        minutes = duration(source) / 60
+
+        raw = os.path.join(tmp, "source.pcm")
+        start = children_cpu()
+        subprocess.run(["ffmpeg", "-v", "error", "-nostdin", "-i", source, "-vn", *PCM_ARGS, raw], check=True)
+        transcode = children_cpu() - start
+
+        results = {}
+        for label, call, arg in (("ffmpeg per call", ffmpeg_call, source), ("raw cache", raw_call, raw)):
+            results[label] = sorted(call(arg) for _ in range(calls))[calls // 2]
+
+        print(f"\n{os.path.basename(source)}: {minutes:.1f} min, raw copy {os.path.getsize(raw) / 1024 / 1024:.1f} MB")
+        print(f"  one-off transcode   {transcode / minutes * 1000:>9,.1f} ms CPU / audio minute")
+        for label, cpu in results.items():
+            print(f"  {label:<19} {cpu / minutes * 1000:>9,.1f} ms CPU / audio minute"
+                  f"  ({cpu / (minutes * 60) * 100:.3f}% of a core per call)")
+        saved = results["ffmpeg per call"] - results["raw cache"]
+        if saved > 0:
+            print(f"  transcoding pays off after {transcode / saved:.1f} plays")
+
+
+if __name__ == "__main__":
+    main(
+        sys.argv[1] if len(sys.argv) > 1 else None,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 3,
+    )
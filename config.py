@@ -1,4 +1,5 @@
-from os import getenv
+import re
+from os import cpu_count, environ, getenv
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -11,6 +12,29 @@ class Config:
         self.BOT_TOKEN = getenv("BOT_TOKEN")
         self.MONGO_URL = getenv("MONGO_URL")
         self.DB_NAME = getenv("DB_NAME", "DeltaMusic")
+        self.DB_BACKEND = getenv("DB_BACKEND", "mongo").lower()
+        self.SQLITE_PATH = getenv("SQLITE_PATH", "delta.db")
+
+        self.STATS_FLUSH_INTERVAL = int(getenv("STATS_FLUSH_INTERVAL", 5))
+        self.STATS_FLUSH_EVENTS = int(getenv("STATS_FLUSH_EVENTS", 200))
+        self.STATS_BUFFER_LIMIT = int(getenv("STATS_BUFFER_LIMIT", 20000))
+        self.ADMIN_CACHE_TTL = int(getenv("ADMIN_CACHE_TTL", 6 * 60 * 60))
+        self.SEARCH_CACHE_TTL = int(getenv("SEARCH_CACHE_TTL", 3 * 24 * 60 * 60))
+        self.SEARCH_NEGATIVE_TTL = int(getenv("SEARCH_NEGATIVE_TTL", 10 * 60))
+        self.VIDEO_CACHE_TTL = int(getenv("VIDEO_CACHE_TTL", 24 * 60 * 60))
+        self.VIDEO_CACHE_STALE = int(getenv("VIDEO_CACHE_STALE", 30 * 24 * 60 * 60))
+        self.YTDLP_WORKERS = int(getenv("YTDLP_WORKERS", max(2, min(4, cpu_count() or 1))))
+        self.YTDLP_TIMEOUT = int(getenv("YTDLP_TIMEOUT", 60))
+        self.YTDLP_DOWNLOAD_TIMEOUT = int(getenv("YTDLP_DOWNLOAD_TIMEOUT", 600))
+        self.DOWNLOAD_CONCURRENCY = int(getenv("DOWNLOAD_CONCURRENCY", max(1, self.YTDLP_WORKERS - 1)))
+        self.DOWNLOAD_CHAT_CONCURRENCY = int(getenv("DOWNLOAD_CHAT_CONCURRENCY", 2))
+        self.DOWNLOAD_RETRY_AFTER = int(getenv("DOWNLOAD_RETRY_AFTER", 60))
+        self.PREFETCH_DEPTH = int(getenv("PREFETCH_DEPTH", 2))
+        self.PREFETCH_BUDGET = int(getenv("PREFETCH_BUDGET", 2048)) * 1024 * 1024
+        self.TRANSCODE_BUDGET = int(getenv("TRANSCODE_BUDGET", 0)) * 1024 * 1024
+        self.TRANSCODE_TOP = int(getenv("TRANSCODE_TOP", 50))
+        self.TRANSCODE_INTERVAL = int(getenv("TRANSCODE_INTERVAL", 30 * 60))
+        self.PROGRESSIVE_STREAM: bool = getenv("PROGRESSIVE_STREAM", "False").lower() == "true"
 
         self.LOGGER_ID = int(getenv("LOGGER_ID", 0))
         self.OWNER_ID = int(getenv("OWNER_ID", 0))
@@ -20,9 +44,17 @@ class Config:
         self.PLAYLIST_LIMIT = int(getenv("PLAYLIST_LIMIT", 20))
         self.FILE_SIZE_LIMIT = int(getenv("FILE_SIZE_LIMIT", 200)) * 1024 * 1024
 
-        self.SESSION1 = getenv("SESSION", None)
-        self.SESSION2 = getenv("SESSION2", None)
-        self.SESSION3 = getenv("SESSION3", None)
+        # SESSION (alias of SESSION1), SESSION2, SESSION3, ... in number order,
+        # then space separated SESSIONS. A session string is only used once.
+        if getenv("SESSION") and getenv("SESSION1") and getenv("SESSION") != getenv("SESSION1"):
+            raise SystemExit("SESSION and SESSION1 are the same assistant, set only one of them.")
+        numbered = sorted(
+            (int(key[7:] or 1), value)
+            for key, value in environ.items()
+            if re.fullmatch(r"SESSION\d*", key) and value
+        )
+        sessions = [value for _, value in numbered] + getenv("SESSIONS", "").split()
+        self.SESSIONS = list(dict.fromkeys(sessions))
 
         self.DONATE_QR_IMAGE = getenv("DONATE_QR_IMAGE", "https://files.catbox.moe/2d927j.jpg")
 
@@ -48,8 +80,12 @@ class Config:
     def check(self):
         missing = [
             var
-            for var in ["API_ID", "API_HASH", "BOT_TOKEN", "MONGO_URL", "LOGGER_ID", "OWNER_ID", "SESSION1"]
+            for var in ["API_ID", "API_HASH", "BOT_TOKEN", "LOGGER_ID", "OWNER_ID", "SESSIONS"]
             if not getattr(self, var)
         ]
+        if self.DB_BACKEND == "mongo" and not self.MONGO_URL:
+            missing.append("MONGO_URL")
         if missing:
             raise SystemExit(f"Missing required environment variables: {', '.join(missing)}")
+        if self.DB_BACKEND not in ("mongo", "sqlite"):
+            raise SystemExit(f"Unknown DB_BACKEND: {self.DB_BACKEND} (expected mongo or sqlite)")
@@ -55,6 +55,17 @@ yt = YouTube()
 from delta.helpers._queue import Queue
 queue = Queue()
 
+from delta.core.prefetch import Prefetcher
+prefetch = Prefetcher(config.PREFETCH_DEPTH, config.PREFETCH_BUDGET)
+
+from delta.core.transcode import Transcoder
+transcoder = Transcoder(
+    "cache/pcm", config.TRANSCODE_BUDGET, config.TRANSCODE_TOP, config.TRANSCODE_INTERVAL
+)
+
+from delta.core.radio import Radio
+radio = Radio()
+
 from delta.core.calls import TgCall
 anon = TgCall()
 
@@ -75,6 +86,8 @@ async def stop() -> None:
 
     await app.exit()
     await userbot.exit()
+    await radio.close()
     await db.close()
+    yt.pool.close()
 
     logger.info("Stopped.\n")
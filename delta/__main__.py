@@ -9,12 +9,18 @@ import importlib
 from pyrogram import idle
 
 from delta import (anon, app, config, db,
-                   logger, stop, userbot, yt, tasks)
+                   logger, stop, transcoder, userbot, yt, tasks)
 from delta.plugins import all_modules
 
 
 async def main():
+    yt.pool.start()
     await db.connect()
+    tasks.append(asyncio.create_task(db.stats.run()))
+    tasks.append(asyncio.create_task(db.active_calls.run()))
+    tasks.append(asyncio.create_task(db.ensure_indexes()))
+    if db.stats_migration_pending:
+        tasks.append(asyncio.create_task(db.migrate_stats_schema()))
     
     # Startup banner
     logger.info("🎵 ═══════════ DELTA MUSIC BOT v3.0.1 ═══════════ 🎵")
@@ -41,6 +47,7 @@ async def main():
     cleanup_task = asyncio.create_task(cleanup.start())
     tasks.append(cleanup_task)
     logger.info("🧹 File cleanup scheduler started")
+    tasks.append(asyncio.create_task(transcoder.run()))
 
     # Start Dashboard Server
     try:
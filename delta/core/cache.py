@@ -0,0 +1,270 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+
+import asyncio
+from collections import OrderedDict
+from datetime import datetime, timezone
+from time import monotonic, time
+from typing import Any, Awaitable, Callable
+
+from delta import logger
+
+_MISSING = object()
+
+
+class TTLCache:
+    registry: dict[str, "TTLCache"] = {}
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        """
+        Bounded LRU cache with per-entry TTL and single-flight loading.
+
+        Concurrent `get_or_load` calls for the same key share one loader call.
+        A `set` or `pop` while a load is in flight wins over the loaded value.
+        Every cache registers itself by name so its counters can be reported.
+
+        Args:
+            name (str): Name shown in /status and the dashboard.
+            maxsize (int): Maximum number of entries, least recently used go first.
+            ttl (float): Seconds an entry stays valid after it is stored.
+        """
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._loading: dict[Any, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.loads = 0
+        self.coalesced = 0
+        TTLCache.registry[name] = self
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, _MISSING, count=False) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key, default=None, count: bool = True):
+        entry = self._data.get(key)
+        if entry is not None:
+            if monotonic() < entry[0]:
+                self._data.move_to_end(key)
+                if count:
+                    self.hits += 1
+                return entry[1]
+            del self._data[key]
+            self.expirations += 1
+        if count:
+            self.misses += 1
+        return default
+
+    def set(self, key, value, ttl: float | None = None) -> None:
+        self._loading.pop(key, None)
+        self._data[key] = (monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key, default=None):
+        self._loading.pop(key, None)
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        self._loading.clear()
+        self._data.clear()
+
+    async def get_or_load(self, key, loader: Callable[[], Awaitable[Any]]):
+        """Return the cached value, loading it once for all concurrent callers."""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        task = self._loading.get(key)
+        if task is None:
+            self.loads += 1
+            task = asyncio.ensure_future(self._load(key, loader))
+            self._loading[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    async def _load(self, key, loader):
+        value = await loader()
+        if self._loading.get(key) is asyncio.current_task():
+            self.set(key, value)
+        return value
+
+    def _done(self, key, task: asyncio.Task) -> None:
+        if self._loading.get(key) is task:
+            del self._loading[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved if every caller went away.
+            task.exception()
+
+    def info(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "loads": self.loads,
+            "coalesced": self.coalesced,
+        }
+
+    @classmethod
+    def report(cls) -> list[dict]:
+        """Counters of every registered cache."""
+        return [cache.info() for cache in cls.registry.values()]
+
+
+class PersistentCache:
+    registry: dict[str, "PersistentCache"] = {}
+
+    def __init__(self, name: str, collection, maxsize: int, ttl: float, negative_ttl: float, stale: float = 0):
+        """
+        Two-tier cache: a TTLCache in front of a database collection.
+
+        Values survive restarts and are shared by every process using the same
+        database. Empty results (None) are cached too, for `negative_ttl`, so
+        repeated lookups for something that does not exist stay cheap. Loader
+        failures (exceptions) are never cached.
+
+        With `stale`, a value older than `ttl` is still returned for that many
+        more seconds while a background task reloads it (stale-while-revalidate).
+
+        Documents are `{_id, value, fresh, until, expires}`, where `expires` feeds
+        a TTL index and `until` is checked on read for backends without one.
+
+        Args:
+            name (str): Name of the memory tier and of the exported counters.
+            collection: The collection backing the second tier.
+            maxsize (int): Maximum number of entries kept in memory.
+            ttl (float): Seconds a value is fresh.
+            negative_ttl (float): Seconds an empty result stays valid.
+            stale (float): Extra seconds a value is served while it is refreshed.
+        """
+        self.name = name
+        self.collection = collection
+        self.memory = TTLCache(name, maxsize, ttl + stale)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stale = stale
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.avg_load = 0.0
+        self.saved = 0.0
+        self._refreshing: dict[Any, asyncio.Task] = {}
+        PersistentCache.registry[name] = self
+
+    async def _read(self, key) -> tuple[Any, float]:
+        try:
+            doc = await self.collection.find_one({"_id": key})
+        except Exception as e:
+            logger.warning(f"{self.name} cache read failed: {type(e).__name__}")
+            return _MISSING, 0
+        if not doc or doc.get("until", 0) <= time():
+            return _MISSING, 0
+        return (doc.get("value"), doc.get("fresh", doc["until"])), doc["until"] - time()
+
+    async def put(self, key, value) -> tuple[Any, float]:
+        """Store a value in both tiers and return its (value, fresh until) entry."""
+        now = time()
+        if value is None:
+            fresh = until = now + self.negative_ttl
+        else:
+            fresh = now + self.ttl
+            until = fresh + self.stale
+        self.memory.set(key, (value, fresh), ttl=until - now)
+        try:
+            await self.collection.update_one(
+                {"_id": key},
+                {"$set": {
+                    "value": value,
+                    "fresh": fresh,
+                    "until": until,
+                    "expires": datetime.fromtimestamp(until, timezone.utc),
+                }},
+                upsert=True,
+            )
+        except Exception as e:
+            logger.warning(f"{self.name} cache write failed: {type(e).__name__}")
+        return value, fresh
+
+    async def _load(self, key, loader):
+        start = monotonic()
+        value = await loader()
+        elapsed = monotonic() - start
+        self.avg_load = elapsed if not self.misses else 0.9 * self.avg_load + 0.1 * elapsed
+        self.misses += 1
+        return await self.put(key, value)
+
+    async def _refresh(self, key, loader) -> None:
+        try:
+            await self._load(key, loader)
+            self.refreshes += 1
+        except Exception as e:
+            logger.debug(f"{self.name} cache refresh of {key} failed: {e}")
+
+    async def get_or_load(self, key, loader: Callable[[], Awaitable[Any]]):
+        """Return the cached value, or run `loader` once and cache its result."""
+        loaded = False
+
+        async def load():
+            nonlocal loaded
+            entry, ttl = await self._read(key)
+            if entry is not _MISSING:
+                self.db_hits += 1
+                # Keep the memory tier from outliving the stored entry.
+                self.memory.set(key, entry, ttl=ttl)
+                return entry
+
+            loaded = True
+            return await self._load(key, loader)
+
+        # Only a value the memory tier already holds is a hit. Callers that
+        # waited on another caller's load or were served by the database are not.
+        cached = key in self.memory
+        value, fresh = await self.memory.get_or_load(key, load)
+        if cached:
+            self.hits += 1
+            self.saved += self.avg_load
+        if not loaded:
+            if fresh <= time() and key not in self._refreshing:
+                task = asyncio.create_task(self._refresh(key, loader))
+                self._refreshing[key] = task
+                task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+        return value
+
+    def info(self) -> dict:
+        lookups = self.hits + self.db_hits + self.misses - self.refreshes
+        return {
+            "name": self.name,
+            "hits": self.hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses - self.refreshes,
+            "refreshes": self.refreshes,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "avg_load_ms": round(self.avg_load * 1000, 1),
+            "saved_seconds": round(self.saved, 1),
+        }
+
+    @classmethod
+    def report(cls) -> list[dict]:
+        """Counters of every registered persistent cache."""
+        return [cache.info() for cache in cls.registry.values()]
@@ -3,21 +3,29 @@
 # This file is part of AnonXMusic
 
 
-from ntgcalls import (ConnectionNotFound, TelegramServerError,
+import asyncio
+import os
+from collections import deque
+from time import monotonic
+
+from ntgcalls import (ConnectionNotFound, MediaSource, TelegramServerError,
                       RTMPStreamingUnsupported)
 from pyrogram import enums, errors, types
 from pyrogram.errors import MessageIdInvalid
 from pyrogram.types import InputMediaPhoto, Message
 from pytgcalls import PyTgCalls, exceptions, types
 from pytgcalls.pytgcalls_session import PyTgCallsSession
+from pytgcalls.types.raw import AudioParameters, AudioStream, Stream
 
-from delta import app, config, db, logger, queue, userbot, yt
+from delta import app, config, db, logger, prefetch, queue, radio, transcoder, userbot, yt
 from delta.helpers import Media, Track, buttons, thumb
 
 
 class TgCall(PyTgCalls):
     def __init__(self):
         self.clients = []
+        # Seconds from a request to the stream starting, by how the media was obtained.
+        self.ttfa = {mode: deque(maxlen=200) for mode in ("progressive", "download", "cached", "raw")}
 
     async def pause(self, chat_id: int) -> bool:
         client = await db.get_assistant(chat_id)
@@ -50,6 +58,7 @@ class TgCall(PyTgCalls):
 
     async def stop(self, chat_id: int) -> None:
         client = await db.get_assistant(chat_id)
+        await radio.leave(chat_id)
         try:
             queue.clear(chat_id)
             await db.remove_call(chat_id)
@@ -62,13 +71,40 @@ class TgCall(PyTgCalls):
             pass
 
 
+    async def ready(self, chat_id: int, media: Media | Track) -> bool:
+        """
+        Whether media can start without waiting for a download.
+
+        True if it has a file, a raw copy from the transcoder, or in progressive
+        mode a direct stream URL. The latter two download the file in the
+        background for seeks. Otherwise the caller has to download it.
+        """
+        if media.file_path:
+            return True
+        if not isinstance(media, Track):
+            return False
+        if not media.video and transcoder.has(media.id):
+            yt.fill(media, chat_id)
+            return True
+        return config.PROGRESSIVE_STREAM and await yt.progressive(media, chat_id)
+
     async def play_media(
         self,
         chat_id: int,
         message: Message,
         media: Media | Track,
         seek_time: int = 0,
+        started: float = 0,
+        downloaded: bool = False,
     ) -> None:
+        """
+        Stream media into the chat's voice chat.
+
+        A Track without a file but with a stream URL (progressive mode) is played
+        from the URL, falling back to the downloaded file if it is refused.
+        `started` is when the user asked for it, to record time-to-first-audio,
+        and `downloaded` whether the file had to be downloaded for it.
+        """
         client = await db.get_assistant(chat_id)
         _thumb = (
             await thumb.generate(media)
@@ -76,27 +112,47 @@ class TgCall(PyTgCalls):
             else config.DEFAULT_THUMB
         )
 
-        if not media.file_path:
+        # Hot tracks may be cached as raw PCM, played without any ffmpeg. It cannot seek.
+        raw = (
+            transcoder.path(media.id)
+            if isinstance(media, Track) and not media.video and seek_time <= 1
+            else None
+        )
+        streaming = not raw and not media.file_path and isinstance(media, Track) and bool(media.stream_url)
+        if not raw and not media.file_path and not streaming and isinstance(media, Track):
+            # The raw copy ready() found was evicted since, wait for the file instead.
+            media.file_path = await yt.download(media.id, video=media.video, chat_id=chat_id)
+            downloaded = True
+        if not raw and not media.file_path and not streaming:
             return await message.edit_text(f"File tidak ditemukan. Hubungi <a href='tg://user?id={config.OWNER_ID}'>owner</a>", parse_mode=enums.ParseMode.HTML)
 
-        stream = types.MediaStream(
-            media_path=media.file_path,
-            audio_parameters=types.AudioQuality.HIGH,
-            video_parameters=types.VideoQuality.HD_720p,
-            audio_flags=types.MediaStream.Flags.REQUIRED,
-            video_flags=(
-                types.MediaStream.Flags.AUTO_DETECT
-                if media.video
-                else types.MediaStream.Flags.IGNORE
-            ),
-            ffmpeg_parameters=f"-ss {seek_time}" if seek_time > 1 else None,
-        )
+        await radio.leave(chat_id)
         try:
-            await client.play(
-                chat_id=chat_id,
-                stream=stream,
-                config=types.GroupCallConfig(auto_start=False),
-            )
+            try:
+                await client.play(
+                    chat_id=chat_id,
+                    stream=self._raw_stream(raw) if raw else self._stream(media, seek_time, streaming),
+                    config=types.GroupCallConfig(auto_start=False),
+                )
+            except (exceptions.NoAudioSourceFound, exceptions.NoVideoSourceFound, exceptions.LiveStreamFound) as e:
+                if not streaming:
+                    raise
+                # The URL expired or was refused, wait for the file instead.
+                logger.warning(f"Direct stream of {media.id} failed ({type(e).__name__}), using the download.")
+                streaming = False
+                media.stream_url = media.stream_audio_url = media.stream_headers = None
+                yt.formats_cache.pop(media.id)
+                media.file_path = await yt.download(media.id, video=media.video, chat_id=chat_id)
+                if not media.file_path:
+                    raise FileNotFoundError(media.id)
+                await client.play(
+                    chat_id=chat_id,
+                    stream=self._stream(media, seek_time, False),
+                    config=types.GroupCallConfig(auto_start=False),
+                )
+            if started:
+                mode = "raw" if raw else "progressive" if streaming else "download" if downloaded else "cached"
+                self.ttfa[mode].append(monotonic() - started)
             if not seek_time:
                 media.time = 1
                 await db.add_call(chat_id)
@@ -163,6 +219,43 @@ class TgCall(PyTgCalls):
             await message.edit_text("Format streaming RTMP tidak didukung.")
 
 
+    @staticmethod
+    def _stream(media: Media | Track, seek_time: int, streaming: bool) -> types.MediaStream:
+        return types.MediaStream(
+            media_path=media.stream_url if streaming else media.file_path,
+            audio_parameters=types.AudioQuality.HIGH,
+            video_parameters=types.VideoQuality.HD_720p,
+            audio_path=media.stream_audio_url if streaming else None,
+            audio_flags=types.MediaStream.Flags.REQUIRED,
+            video_flags=(
+                types.MediaStream.Flags.AUTO_DETECT
+                if media.video
+                else types.MediaStream.Flags.IGNORE
+            ),
+            headers=media.stream_headers if streaming else None,
+            ffmpeg_parameters=f"-ss {seek_time}" if seek_time > 1 else None,
+        )
+
+    @staticmethod
+    def _raw_stream(path: str) -> Stream:
+        return Stream(
+            microphone=AudioStream(
+                MediaSource.FILE, path, AudioParameters(*types.AudioQuality.HIGH.value)
+            ),
+        )
+
+    def ttfa_info(self) -> dict:
+        """Time-to-first-audio per mode, in milliseconds."""
+        info = {}
+        for mode, samples in self.ttfa.items():
+            samples = sorted(samples)
+            info[mode] = {
+                "count": len(samples),
+                "p50_ms": round(samples[len(samples) // 2] * 1000) if samples else 0,
+                "p95_ms": round(samples[int(len(samples) * 0.95)] * 1000) if samples else 0,
+            }
+        return info
+
     async def replay(self, chat_id: int) -> None:
         if not await db.get_call(chat_id):
             return
@@ -175,6 +268,7 @@ class TgCall(PyTgCalls):
     async def play_next(self, chat_id: int) -> None:
         if not await db.get_call(chat_id):
             return
+        start = monotonic()
 
         old_media = queue.get_current(chat_id)
         if old_media and old_media.message_id:
@@ -222,8 +316,15 @@ class TgCall(PyTgCalls):
                 pass
 
         msg = await app.send_message(chat_id=chat_id, text=msg_text)
-        if not media.file_path:
-            media.file_path = await yt.download(media.id, video=media.video)
+        if isinstance(media, Track) and media.file_path and not os.path.exists(media.file_path):
+            # Prefetched, but cleaned up before its turn came.
+            media.file_path = None
+        # A raw copy from the transcoder starts as fast as a prefetched file.
+        hit = bool(media.file_path) or (
+            isinstance(media, Track) and not media.video and transcoder.has(media.id)
+        )
+        if not await self.ready(chat_id, media):
+            media.file_path = await yt.download(media.id, video=media.video, chat_id=chat_id)
             if not media.file_path:
                 await self.stop(chat_id)
                 return await msg.edit_text(
@@ -232,7 +333,9 @@ class TgCall(PyTgCalls):
                 )
 
         media.message_id = msg.id
-        await self.play_media(chat_id, msg, media)
+        await self.play_media(chat_id, msg, media, started=start, downloaded=not hit)
+        if isinstance(media, Track):
+            prefetch.record(hit, monotonic() - start)
 
 
     async def ping(self) -> float:
@@ -241,27 +344,25 @@ class TgCall(PyTgCalls):
 
 
     async def decorators(self, client: PyTgCalls) -> None:
-        for client in self.clients:
-
-            @client.on_update()
-            async def update_handler(_, update: types.Update) -> None:
-                if isinstance(update, types.StreamEnded):
-                    if update.stream_type == types.StreamEnded.Type.AUDIO:
-                        await self.play_next(update.chat_id)
-                elif isinstance(update, types.ChatUpdate):
-                    if update.status in [
-                        types.ChatUpdate.Status.KICKED,
-                        types.ChatUpdate.Status.LEFT_GROUP,
-                        types.ChatUpdate.Status.CLOSED_VOICE_CHAT,
-                    ]:
-                        await self.stop(update.chat_id)
+        @client.on_update()
+        async def update_handler(_, update: types.Update) -> None:
+            if isinstance(update, types.StreamEnded):
+                if update.stream_type == types.StreamEnded.Type.AUDIO:
+                    await self.play_next(update.chat_id)
+            elif isinstance(update, types.ChatUpdate):
+                if update.status in [
+                    types.ChatUpdate.Status.KICKED,
+                    types.ChatUpdate.Status.LEFT_GROUP,
+                    types.ChatUpdate.Status.CLOSED_VOICE_CHAT,
+                ]:
+                    await self.stop(update.chat_id)
 
 
     async def boot(self) -> None:
         PyTgCallsSession.notice_displayed = True
-        for ub in userbot.clients:
-            client = PyTgCalls(ub, cache_duration=100)
-            await client.start()
-            self.clients.append(client)
+        # One PyTgCalls per assistant, in the same order, so an assistant number indexes both.
+        self.clients = [PyTgCalls(ub, cache_duration=100) for ub in userbot.clients]
+        await asyncio.gather(*(client.start() for client in self.clients))
+        for client in self.clients:
             await self.decorators(client)
-        logger.info("PyTgCalls client(s) started.")
+        logger.info(f"{len(self.clients)} PyTgCalls client(s) started.")
@@ -0,0 +1,238 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+
+import asyncio
+import itertools
+import os
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+from pathlib import Path
+from time import monotonic
+from typing import Awaitable, Callable, Hashable
+
+from delta import logger
+from delta.core.cache import TTLCache
+
+
+class Priority(IntEnum):
+    """Download priority classes, lower runs first."""
+    NOW_PLAYING = 0
+    PREFETCH = 1
+    USER = 2
+    BACKGROUND = 3
+
+
+@dataclass(eq=False)
+class _Ticket:
+    priority: Priority
+    seq: int
+    chat_id: int | None
+    key: Hashable
+    queued_at: float = field(default_factory=monotonic)
+    future: asyncio.Future = field(default=None, repr=False)
+
+
+class DownloadScheduler:
+    def __init__(self, limit: int, per_chat: int):
+        """
+        Admission control for downloads, by priority class.
+
+        At most `limit` downloads run at once and at most `per_chat` for one
+        chat. When a slot frees up the waiting download with the best priority
+        gets it, FIFO within a class. One slot is kept for NOW_PLAYING, which
+        also ignores the per-chat limit, so a chat waiting for its track is
+        never stuck behind playlists, /song requests or prefetches.
+
+        Args:
+            limit (int): Downloads running at once.
+            per_chat (int): Downloads running at once for a single chat.
+        """
+        self.limit = max(1, limit)
+        self.per_chat = max(1, per_chat)
+        self.reserved = 1 if self.limit > 1 else 0
+        self.active = 0
+        self._chats: dict[int, int] = {}
+        self._waiting: list[_Ticket] = []
+        self._seq = itertools.count()
+        self.started = {priority.name: 0 for priority in Priority}
+        self.waited = {priority.name: 0.0 for priority in Priority}
+        self.promotions = 0
+
+    def _admits(self, ticket: _Ticket) -> bool:
+        if ticket.priority == Priority.NOW_PLAYING:
+            return self.active < self.limit
+        if self.active >= self.limit - self.reserved:
+            return False
+        return ticket.chat_id is None or self._chats.get(ticket.chat_id, 0) < self.per_chat
+
+    def _dispatch(self) -> None:
+        for ticket in sorted(self._waiting, key=lambda t: (t.priority, t.seq)):
+            if not self._admits(ticket):
+                continue
+            self._waiting.remove(ticket)
+            self.active += 1
+            if ticket.chat_id is not None:
+                self._chats[ticket.chat_id] = self._chats.get(ticket.chat_id, 0) + 1
+            self.started[ticket.priority.name] += 1
+            self.waited[ticket.priority.name] += monotonic() - ticket.queued_at
+            ticket.future.set_result(None)
+
+    def _release(self, ticket: _Ticket) -> None:
+        self.active -= 1
+        if ticket.chat_id is not None:
+            count = self._chats.pop(ticket.chat_id) - 1
+            if count:
+                self._chats[ticket.chat_id] = count
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority, chat_id: int | None = None, key: Hashable = None):
+        """Wait for a download slot and hold it for the duration of the block."""
+        ticket = _Ticket(Priority(priority), next(self._seq), chat_id, key)
+        ticket.future = asyncio.get_running_loop().create_future()
+        self._waiting.append(ticket)
+        self._dispatch()
+        try:
+            await ticket.future
+        except asyncio.CancelledError:
+            if ticket in self._waiting:
+                self._waiting.remove(ticket)
+            elif ticket.future.done() and not ticket.future.cancelled():
+                self._release(ticket)
+            raise
+        try:
+            yield
+        finally:
+            self._release(ticket)
+
+    def promote(self, key: Hashable, priority: Priority) -> None:
+        """Raise the priority of a queued download, e.g. a prefetch that is now playing."""
+        for ticket in self._waiting:
+            if ticket.key == key and priority < ticket.priority:
+                ticket.priority = Priority(priority)
+                self.promotions += 1
+        self._dispatch()
+
+    def info(self) -> dict:
+        queued = {priority.name: 0 for priority in Priority}
+        for ticket in self._waiting:
+            queued[ticket.priority.name] += 1
+        return {
+            "active": self.active,
+            "limit": self.limit,
+            "queued": queued,
+            "started": dict(self.started),
+            "avg_wait_ms": {
+                name: round(self.waited[name] / count * 1000, 1) if count else 0.0
+                for name, count in self.started.items()
+            },
+            "promotions": self.promotions,
+        }
+
+
+class DownloadManager:
+    def __init__(self, scheduler: DownloadScheduler, failure_ttl: float = 60):
+        """
+        Single-flight downloads into the downloads directory.
+
+        Every file is identified by a key, e.g. (video_id, video, quality).
+        Concurrent requests for the same key share one download, so a track
+        prefetched by the timer and requested by play_next is fetched once.
+
+        The fetcher writes to a temporary path which is renamed into place only
+        once it completed, so a file that exists is always a whole one. Failed
+        keys are remembered for `failure_ttl` seconds and fail fast meanwhile.
+
+        Downloads wait for a slot from `scheduler`. A caller asking with a
+        better priority than the one a queued download was started with
+        promotes it.
+
+        Args:
+            scheduler (DownloadScheduler): Admission control for the downloads.
+            failure_ttl (float): Seconds a failed download is not retried.
+        """
+        self.scheduler = scheduler
+        self.failures = TTLCache("download_failures", maxsize=1000, ttl=failure_ttl)
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.downloads = 0
+        self.coalesced = 0
+        self.failed = 0
+
+    @staticmethod
+    def temp_path(path: str) -> str:
+        """A unique hidden sibling of `path` for a download in progress."""
+        target = Path(path)
+        return str(target.with_name(f".{target.stem}.{uuid.uuid4().hex[:8]}{target.suffix}"))
+
+    async def get(
+        self,
+        key: Hashable,
+        path: str,
+        fetch: Callable[[str], Awaitable[bool]],
+        priority: Priority = Priority.USER,
+        chat_id: int | None = None,
+    ) -> str | None:
+        """
+        Return `path` once it exists, downloading it at most once at a time.
+
+        `fetch` is called with a temporary path and must write the file there,
+        returning False (or raising) on failure. Returns None if it failed.
+        """
+        if os.path.exists(path):
+            self.hits += 1
+            return path
+        if key in self.failures:
+            return None
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.downloads += 1
+            task = asyncio.ensure_future(self._download(key, path, fetch, priority, chat_id))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+            self.scheduler.promote(key, priority)
+        # A caller giving up must not cancel the download for everyone else.
+        return await asyncio.shield(task)
+
+    async def _download(self, key, path: str, fetch, priority: Priority, chat_id: int | None) -> str | None:
+        temp = self.temp_path(path)
+        try:
+            async with self.scheduler.slot(priority, chat_id, key):
+                ok = await fetch(temp)
+            if ok and os.path.exists(temp):
+                os.replace(temp, path)
+                return path
+        except Exception as e:
+            logger.warning(f"Download of {key} failed: {type(e).__name__}: {e}")
+        finally:
+            self._discard(temp)
+
+        self.failed += 1
+        self.failures.set(key, True)
+        return None
+
+    @staticmethod
+    def _discard(temp: str) -> None:
+        """Remove the temporary file and any fragments written next to it."""
+        target = Path(temp)
+        for leftover in target.parent.glob(f"{target.stem}*"):
+            try:
+                leftover.unlink()
+            except OSError:
+                pass
+
+    def info(self) -> dict:
+        return {
+            "hits": self.hits,
+            "downloads": self.downloads,
+            "coalesced": self.coalesced,
+            "failed": self.failed,
+            "in_flight": len(self._inflight),
+        }
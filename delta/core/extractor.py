@@ -0,0 +1,218 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+
+import asyncio
+import itertools
+import multiprocessing
+import threading
+from dataclasses import dataclass, field
+
+import yt_dlp
+
+import ytworker
+from delta import logger
+
+
+class WorkerError(Exception):
+    def __init__(self, kind: str, message: str):
+        """A yt-dlp job failed; `kind` is the exception class name, e.g. DownloadError."""
+        super().__init__(f"{kind}: {message}")
+        self.kind = kind
+        self.message = message
+
+
+def _run_local(kind: str, url: str, opts: dict):
+    try:
+        with yt_dlp.YoutubeDL(opts) as ydl:
+            return ytworker.execute(ydl, kind, url)
+    except Exception as e:
+        raise WorkerError(type(e).__name__, str(e)) from e
+
+
+@dataclass(eq=False)
+class _Worker:
+    process: multiprocessing.Process
+    conn: object
+    job: int | None = None
+    retired: bool = False
+    reader: threading.Thread = field(default=None, repr=False)
+
+
+class ExtractorPool:
+    def __init__(self, workers: int, timeout: float, download_timeout: float):
+        """
+        Pool of long-lived yt-dlp worker processes.
+
+        Extraction and downloads run outside the bot process, so they neither
+        hold the GIL nor share the default executor with the event loop. Each
+        worker keeps its YoutubeDL instances (and with them cookies and
+        extractor state) between jobs. A job that exceeds its timeout or whose
+        caller is cancelled gets its worker killed and replaced.
+
+        Workers are forked from a fork server that only imports `ytworker`
+        and yt_dlp, never from the running bot, so they do not inherit its
+        threads or the locks those hold. With `workers` set to 0 jobs run in a
+        thread instead, as before.
+
+        Args:
+            workers (int): Number of worker processes.
+            timeout (float): Seconds allowed for an extraction.
+            download_timeout (float): Seconds allowed for a download.
+        """
+        self.size = workers
+        # Downloads never take the last worker, so extractions are not stuck behind them.
+        self.download_limit = max(1, workers - 1)
+        self.timeout = timeout
+        self.download_timeout = download_timeout
+        self.workers: list[_Worker] = []
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.jobs = 0
+        self.timeouts = 0
+        self.restarts = 0
+        self._ctx = multiprocessing.get_context("forkserver")
+        self._ctx.set_forkserver_preload(["ytworker"])
+        self._idle: asyncio.Queue[_Worker] | None = None
+        self._downloads: asyncio.Semaphore | None = None
+        self._futures: dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+
+    def start(self) -> None:
+        if not self.size or self.loop:
+            return
+        self.loop = asyncio.get_running_loop()
+        self._idle = asyncio.Queue()
+        self._downloads = asyncio.Semaphore(self.download_limit)
+        for _ in range(self.size):
+            self._spawn()
+        logger.info(f"Started {self.size} yt-dlp worker(s).")
+
+    def _spawn(self) -> None:
+        parent, child = self._ctx.Pipe()
+        process = self._ctx.Process(target=ytworker.main, args=(child,), name="yt-dlp-worker", daemon=True)
+        process.start()
+        child.close()
+
+        worker = _Worker(process=process, conn=parent)
+        worker.reader = threading.Thread(target=self._read, args=(worker,), name="yt-dlp-reader", daemon=True)
+        worker.reader.start()
+        self.workers.append(worker)
+        self._idle.put_nowait(worker)
+
+    def _read(self, worker: _Worker) -> None:
+        """Reader thread: hand results back to the event loop until the worker exits."""
+        while True:
+            try:
+                job_id, ok, payload = worker.conn.recv()
+            except (EOFError, OSError):
+                break
+            self.loop.call_soon_threadsafe(self._resolve, job_id, ok, payload)
+        worker.conn.close()
+        self.loop.call_soon_threadsafe(self._lost, worker)
+
+    def _resolve(self, job_id: int, ok: bool, payload) -> None:
+        future = self._futures.get(job_id)
+        if not future or future.done():
+            return
+        if ok:
+            future.set_result(payload)
+        else:
+            future.set_exception(WorkerError(*payload))
+
+    def _lost(self, worker: _Worker) -> None:
+        if worker.retired:
+            return
+        logger.warning(f"yt-dlp worker {worker.process.pid} exited unexpectedly, restarting it.")
+        if worker.job is not None:
+            self._resolve(worker.job, False, ("WorkerDied", f"exit code {worker.process.exitcode}"))
+        self._replace(worker)
+
+    def _retire(self, worker: _Worker) -> None:
+        if worker.retired:
+            return
+        worker.retired = True
+        self.workers.remove(worker)
+        worker.process.kill()
+        # Reap it off the loop, the reader thread sees EOF and exits on its own.
+        self.loop.run_in_executor(None, worker.process.join, 5)
+
+    def _replace(self, worker: _Worker) -> None:
+        self._retire(worker)
+        self.restarts += 1
+        self._spawn()
+
+    async def _acquire(self, kind: str) -> _Worker:
+        """Wait for an idle worker, and for a download slot first if `kind` is a download."""
+        if kind == "download":
+            await self._downloads.acquire()
+        try:
+            worker = await self._idle.get()
+            while worker.retired:
+                worker = await self._idle.get()
+        except BaseException:
+            if kind == "download":
+                self._downloads.release()
+            raise
+        return worker
+
+    async def run(self, kind: str, url: str, opts: dict, timeout: float | None = None):
+        """
+        Run a yt-dlp job ("extract" or "download") and return its result.
+
+        The timeout covers waiting for a free worker as well as the job itself.
+
+        Raises:
+            WorkerError: If yt-dlp raised, with the original exception class name.
+            asyncio.TimeoutError: If the job did not finish within the timeout.
+        """
+        timeout = timeout or (self.download_timeout if kind == "download" else self.timeout)
+        if not self.loop:
+            return await asyncio.wait_for(asyncio.to_thread(_run_local, kind, url, opts), timeout)
+
+        deadline = self.loop.time() + timeout
+        try:
+            worker = await asyncio.wait_for(self._acquire(kind), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.warning(f"yt-dlp {kind} of {url} found no free worker within {timeout}s.")
+            raise
+
+        job_id = next(self._ids)
+        future = self.loop.create_future()
+        self._futures[job_id] = future
+        worker.job = job_id
+        self.jobs += 1
+        try:
+            worker.conn.send((job_id, kind, url, opts))
+            return await asyncio.wait_for(future, max(0, deadline - self.loop.time()))
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.warning(f"yt-dlp {kind} of {url} timed out after {timeout}s, restarting worker.")
+            self._replace(worker)
+            raise
+        except asyncio.CancelledError:
+            self._replace(worker)
+            raise
+        finally:
+            self._futures.pop(job_id, None)
+            worker.job = None
+            if not worker.retired:
+                self._idle.put_nowait(worker)
+            if kind == "download":
+                self._downloads.release()
+
+    def close(self) -> None:
+        if not self.loop:
+            return
+        for worker in list(self.workers):
+            self._retire(worker)
+
+    def info(self) -> dict:
+        return {
+            "workers": len(self.workers),
+            "busy": sum(1 for worker in self.workers if worker.job is not None),
+            "jobs": self.jobs,
+            "timeouts": self.timeouts,
+            "restarts": self.restarts,
+        }
@@ -0,0 +1,83 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+"""
+Declarative index registry and hot query catalogue for the Mongo layer.
+
+INDEXES is ensured idempotently at boot by MongoDB.ensure_indexes().
+hot_queries() lists the queries on the request path; MongoDB.audit_queries()
+runs explain() on each of them and flags any plan that falls back to a
+collection scan. Add an entry to INDEXES and hot_queries() whenever a new
+query is introduced.
+"""
+
+from datetime import datetime
+
+# collection -> [(keys, options)]
+INDEXES: dict[str, list[tuple[list[tuple[str, int]], dict]]] = {
+    "stats": [
+        ([("count", -1)], {}),
+    ],
+    "user_plays": [
+        ([("count", -1)], {}),
+    ],
+    "chat_plays": [
+        ([("count", -1)], {}),
+    ],
+    "chat_track_plays": [
+        ([("chat_id", 1), ("count", -1)], {}),
+    ],
+    "user_track_plays": [
+        ([("user_id", 1), ("count", -1)], {}),
+    ],
+    "chat_user_plays": [
+        ([("chat_id", 1), ("count", -1)], {}),
+    ],
+    "search_cache": [
+        ([("expires", 1)], {"expireAfterSeconds": 0}),
+    ],
+    "video_cache": [
+        ([("expires", 1)], {"expireAfterSeconds": 0}),
+    ],
+}
+
+
+def hot_queries() -> list[dict]:
+    """Sample instances of the hot queries, as find() arguments."""
+    today = datetime.now().strftime("%Y-%m-%d")
+    playable = {
+        "duration": {
+            "$nin": ["Live", "Unknown"],
+            "$not": {"$regex": "^Stream|Live$", "$options": "i"}
+        },
+    }
+    return [
+        {"name": "global tops", "collection": "stats", "filter": playable, "sort": [("count", -1)], "limit": 10},
+        {"name": "top users", "collection": "user_plays", "filter": {}, "sort": [("count", -1)], "limit": 10},
+        {"name": "top chats", "collection": "chat_plays", "filter": {}, "sort": [("count", -1)], "limit": 10},
+        {"name": "chat rank", "collection": "chat_plays", "filter": {"count": {"$gt": 0}}},
+        {"name": "group tracks", "collection": "chat_track_plays", "filter": {"chat_id": 0, **playable}, "sort": [("count", -1)], "limit": 10},
+        {"name": "group users", "collection": "chat_user_plays", "filter": {"chat_id": 0}, "sort": [("count", -1)], "limit": 10},
+        {"name": "daily stats", "collection": "daily_stats", "filter": {"_id": {"$in": [today]}}},
+        {"name": "hourly stats", "collection": "hourly_stats", "filter": {"_id": {"$in": [today]}}},
+        {"name": "playlist lookup", "collection": "users", "filter": {"_id": 0, "playlist.track_id": ""}},
+        {"name": "chat settings", "collection": "chats", "filter": {"_id": 0}},
+        {"name": "search cache", "collection": "search_cache", "filter": {"_id": ""}},
+        {"name": "video cache", "collection": "video_cache", "filter": {"_id": ""}},
+        {"name": "auth users", "collection": "auth", "filter": {"_id": 0}},
+        {"name": "assistant", "collection": "assistant", "filter": {"_id": 0}},
+    ]
+
+
+def plan_stages(plan: dict) -> set[str]:
+    """Collect every stage name in an explain() plan tree."""
+    stages = set()
+    if stage := plan.get("stage"):
+        stages.add(stage)
+    for key in ("inputStage", "queryPlan"):
+        if isinstance(plan.get(key), dict):
+            stages |= plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        stages |= plan_stages(child)
+    return stages
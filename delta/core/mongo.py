@@ -3,55 +3,95 @@
 # This file is part of AnonXMusic
 
 
+import asyncio
 from random import randint
 from time import time
 
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 
 from delta import config, logger, userbot
+from delta.core.cache import TTLCache
+from delta.core.indexes import INDEXES, hot_queries, plan_stages
+from delta.core.registry import ActiveCallRegistry
+from delta.core.settings import ChatSettings, SettingsCache
+from delta.core.stats_buffer import StatsBuffer
 
 
 class MongoDB:
+    MAX_HISTORY_DAYS = 366
+    PLATFORMS = ("youtube", "spotify", "soundcloud", "local", "other")
+    STATS_SCHEMA = 2
+    MIGRATION_BATCH = 1000
+
     def __init__(self):
         """
-        Initialize the MongoDB connection.
+        Initialize the database connection.
+
+        DB_BACKEND selects MongoDB (Motor) or the embedded SQLite backend, which
+        implements the same collection API so every method below works on both.
         """
-        self.mongo = AsyncIOMotorClient(config.MONGO_URL, serverSelectionTimeoutMS=12500)
+        if config.DB_BACKEND == "sqlite":
+            from delta.core.sqlite import SQLiteClient
+
+            self.mongo = SQLiteClient(config.SQLITE_PATH)
+        else:
+            from motor.motor_asyncio import AsyncIOMotorClient
+
+            self.mongo = AsyncIOMotorClient(config.MONGO_URL, serverSelectionTimeoutMS=12500)
         self.db = self.mongo[config.DB_NAME]
 
-        self.admin_list = {}
+        self.admin_list = TTLCache("admins", maxsize=5000, ttl=config.ADMIN_CACHE_TTL)
         self.active_callsdb = self.db.active_calls
-        self.admin_play = []
-        self.blacklisted = []
-        self.cmd_delete = []
+        self.active_calls = ActiveCallRegistry(self.active_callsdb)
+        self.blacklisted: set[int] = set()
         self.notified = []
         self.cache = self.db.cache
         self.logger = False
 
-        self.assistant = {}
+        self.assistant = TTLCache("assistant", maxsize=10000, ttl=86400)
         self.assistantdb = self.db.assistant
 
-        self.auth = {}
+        self.auth = TTLCache("auth", maxsize=10000, ttl=3600)
         self.authdb = self.db.auth
 
-        self.chats = []
+        self.chats: set[int] = set()
         self.chatsdb = self.db.chats
+        self.settings = SettingsCache(self.chatsdb)
 
 
 
-        self.users = []
+        self.users: set[int] = set()
         self.usersdb = self.db.users
 
-        self.pm_warns = {}
+        self.pm_warns = TTLCache("pm_warns", maxsize=10000, ttl=3600)
         self.pm_warnsdb = self.db.pm_warns
 
-        self.pm_messages = {}
+        self.pm_messages = TTLCache("pm_messages", maxsize=1, ttl=3600)
         self.pm_messagesdb = self.db.pm_messages
 
         self.statsdb = self.db.stats
         self.queriesdb = self.db.queries
         self.dailydb = self.db.daily_stats
         self.hourlydb = self.db.hourly_stats
+        self._day_memo: dict[str, dict[str, dict]] = {}
+        self.userplaysdb = self.db.user_plays
+        self.chatplaysdb = self.db.chat_plays
+        self.chattrackdb = self.db.chat_track_plays
+        self.usertrackdb = self.db.user_track_plays
+        self.chatuserdb = self.db.chat_user_plays
+        self.stats_migration_pending = False
+        self._migration_lock = asyncio.Lock()
+        self.platformdb = self.db.platform_counters
+        self.search_cachedb = self.db.search_cache
+        self.video_cachedb = self.db.video_cache
+
+        self.stats = StatsBuffer(
+            self.db,
+            interval=config.STATS_FLUSH_INTERVAL,
+            max_events=config.STATS_FLUSH_EVENTS,
+            max_docs=config.STATS_BUFFER_LIMIT,
+        )
 
     async def connect(self) -> None:
         """Check if we can connect to the database.
@@ -68,53 +108,61 @@ class MongoDB:
             raise SystemExit(f"Database connection failed: {type(e).__name__}") from e
 
     async def close(self) -> None:
-        """Close the connection to the database."""
+        """Flush pending stats and close the connection to the database."""
+        await self.stats.flush()
+        await self.active_calls.flush()
         await self.mongo.close()
         logger.info("Database connection closed.")
 
-    # CACHE
-    # CACHE
+    # ACTIVE CALLS
     async def get_call(self, chat_id: int) -> bool:
-        doc = await self.active_callsdb.find_one({"_id": chat_id})
-        return bool(doc)
+        return chat_id in self.active_calls
 
     async def add_call(self, chat_id: int) -> None:
-        await self.active_callsdb.update_one(
-            {"_id": chat_id},
-            {"$set": {"playing": 1}},
-            upsert=True
-        )
+        self.active_calls.add(chat_id, await self._get_assistant_num(chat_id))
 
     async def remove_call(self, chat_id: int) -> None:
-        await self.active_callsdb.delete_one({"_id": chat_id})
+        self.active_calls.remove(chat_id)
 
     async def playing(self, chat_id: int, paused: bool = None) -> bool | None:
         if paused is not None:
-            await self.active_callsdb.update_one(
-                {"_id": chat_id},
-                {"$set": {"playing": int(not paused)}},
-                upsert=True
-            )
-        doc = await self.active_callsdb.find_one({"_id": chat_id})
-        return bool(doc and doc.get("playing"))
+            self.active_calls.set_playing(chat_id, not paused)
+        call = self.active_calls.get(chat_id)
+        return bool(call and call.playing)
 
     async def get_active_calls(self) -> list:
         """Get list of active chat IDs."""
-        return [doc["_id"] async for doc in self.active_callsdb.find()]
+        return self.active_calls.keys()
 
     async def get_admins(self, chat_id: int, reload: bool = False) -> list[int]:
         from delta.helpers._admins import reload_admins
 
-        if chat_id not in self.admin_list or reload:
-            self.admin_list[chat_id] = await reload_admins(chat_id)
-        return self.admin_list[chat_id]
+        if reload:
+            self.admin_list.pop(chat_id)
+        admins = await self.admin_list.get_or_load(chat_id, lambda: reload_admins(chat_id))
+        if not admins:
+            # The fetch failed (e.g. missing rights), retry soon instead of for hours.
+            self.admin_list.set(chat_id, admins, ttl=60)
+        return admins
+
+    def update_admin(self, chat_id: int, user_id: int, admin: bool) -> None:
+        """Apply a promotion or demotion to the cached admin list."""
+        admins = self.admin_list.get(chat_id, count=False)
+        if admins is None:
+            # Not cached, the next lookup loads the current list.
+            self.admin_list.pop(chat_id)
+        elif admin and user_id not in admins:
+            admins.append(user_id)
+        elif not admin and user_id in admins:
+            admins.remove(user_id)
 
     # AUTH METHODS
+    async def _load_auth(self, chat_id: int) -> set[int]:
+        doc = await self.authdb.find_one({"_id": chat_id}) or {}
+        return set(doc.get("user_ids", []))
+
     async def _get_auth(self, chat_id: int) -> set[int]:
-        if chat_id not in self.auth:
-            doc = await self.authdb.find_one({"_id": chat_id}) or {}
-            self.auth[chat_id] = set(doc.get("user_ids", []))
-        return self.auth[chat_id]
+        return await self.auth.get_or_load(chat_id, lambda: self._load_auth(chat_id))
 
     async def is_auth(self, chat_id: int, user_id: int) -> bool:
         return user_id in await self._get_auth(chat_id)
@@ -143,30 +191,32 @@ class MongoDB:
             {"$set": {"num": num}},
             upsert=True,
         )
-        self.assistant[chat_id] = num
+        self.assistant.set(chat_id, num)
+        return num
+
+    async def _load_assistant(self, chat_id: int) -> int:
+        doc = await self.assistantdb.find_one({"_id": chat_id})
+        return doc["num"] if doc else await self.set_assistant(chat_id)
+
+    async def _get_assistant_num(self, chat_id: int) -> int:
+        num = await self.assistant.get_or_load(chat_id, lambda: self._load_assistant(chat_id))
+        if not 0 < num <= len(userbot.clients):
+            # The assistant was removed from the sessions since it was assigned.
+            num = await self.set_assistant(chat_id)
         return num
 
     async def get_assistant(self, chat_id: int):
         from delta import anon
 
-        if chat_id not in self.assistant:
-            doc = await self.assistantdb.find_one({"_id": chat_id})
-            num = doc["num"] if doc else await self.set_assistant(chat_id)
-            self.assistant[chat_id] = num
-
-        return anon.clients[self.assistant[chat_id] - 1]
+        return anon.clients[await self._get_assistant_num(chat_id) - 1]
 
     async def get_client(self, chat_id: int):
-        if chat_id not in self.assistant:
-            await self.get_assistant(chat_id)
-        return {1: userbot.one, 2: userbot.two, 3: userbot.three}.get(
-            self.assistant[chat_id]
-        )
+        return userbot.clients[await self._get_assistant_num(chat_id) - 1]
 
     # BLACKLIST METHODS
     async def add_blacklist(self, chat_id: int) -> None:
         if str(chat_id).startswith("-"):
-            self.blacklisted.append(chat_id)
+            self.blacklisted.add(chat_id)
             return await self.cache.update_one(
                 {"_id": "bl_chats"}, {"$addToSet": {"chat_ids": chat_id}}, upsert=True
             )
@@ -176,7 +226,7 @@ class MongoDB:
 
     async def del_blacklist(self, chat_id: int) -> None:
         if str(chat_id).startswith("-"):
-            self.blacklisted.remove(chat_id)
+            self.blacklisted.discard(chat_id)
             return await self.cache.update_one(
                 {"_id": "bl_chats"},
                 {"$pull": {"chat_ids": chat_id}},
@@ -186,11 +236,11 @@ class MongoDB:
             {"$pull": {"user_ids": chat_id}},
         )
 
-    async def get_blacklisted(self, chat: bool = False) -> list[int]:
+    async def get_blacklisted(self, chat: bool = False) -> set[int] | list[int]:
         if chat:
             if not self.blacklisted:
                 doc = await self.cache.find_one({"_id": "bl_chats"})
-                self.blacklisted.extend(doc.get("chat_ids", []) if doc else [])
+                self.blacklisted.update(doc.get("chat_ids", []) if doc else [])
             return self.blacklisted
         doc = await self.cache.find_one({"_id": "bl_users"})
         return doc.get("user_ids", []) if doc else []
@@ -201,39 +251,30 @@ class MongoDB:
 
     async def add_chat(self, chat_id: int) -> None:
         if not await self.is_chat(chat_id):
-            self.chats.append(chat_id)
+            self.chats.add(chat_id)
             await self.chatsdb.insert_one({"_id": chat_id})
 
     async def rm_chat(self, chat_id: int) -> None:
         if await self.is_chat(chat_id):
-            self.chats.remove(chat_id)
+            self.chats.discard(chat_id)
             await self.chatsdb.delete_one({"_id": chat_id})
 
-    async def get_chats(self) -> list:
+    async def get_chats(self) -> set[int]:
         if not self.chats:
-            self.chats.extend([chat["_id"] async for chat in self.chatsdb.find()])
+            self.chats.update([chat["_id"] async for chat in self.chatsdb.find({}, {"_id": 1})])
         return self.chats
 
+    # CHAT SETTINGS
+    async def get_settings(self, chat_id: int) -> ChatSettings:
+        """Get all player settings of a chat with at most one database read."""
+        return await self.settings.get(chat_id)
+
     # COMMAND DELETE
     async def get_cmd_delete(self, chat_id: int) -> bool:
-        if chat_id not in self.cmd_delete:
-            doc = await self.chatsdb.find_one({"_id": chat_id})
-            if doc and doc.get("cmd_delete"):
-                self.cmd_delete.append(chat_id)
-        return chat_id in self.cmd_delete
+        return (await self.settings.get(chat_id)).cmd_delete
 
     async def set_cmd_delete(self, chat_id: int, delete: bool = False) -> None:
-        if delete:
-            self.cmd_delete.append(chat_id)
-        else:
-            self.cmd_delete.remove(chat_id)
-        await self.chatsdb.update_one(
-            {"_id": chat_id},
-            {"$set": {"cmd_delete": delete}},
-            upsert=True,
-        )
-
-
+        await self.settings.set(chat_id, cmd_delete=delete)
 
     # LOGGER METHODS
     async def is_logger(self) -> bool:
@@ -255,86 +296,46 @@ class MongoDB:
 
     # PLAY MODE METHODS
     async def get_play_mode(self, chat_id: int) -> bool:
-        if chat_id not in self.admin_play:
-            doc = await self.chatsdb.find_one({"_id": chat_id})
-            if doc and doc.get("admin_play"):
-                self.admin_play.append(chat_id)
-        return chat_id in self.admin_play
+        return (await self.settings.get(chat_id)).admin_play
 
     async def set_play_mode(self, chat_id: int, remove: bool = False) -> None:
-        if remove and chat_id in self.admin_play:
-            self.admin_play.remove(chat_id)
-        else:
-            self.admin_play.append(chat_id)
-        await self.chatsdb.update_one(
-            {"_id": chat_id},
-            {"$set": {"admin_play": not remove}},
-            upsert=True,
-        )
+        await self.settings.set(chat_id, admin_play=not remove)
 
     # LOOP MODE METHODS
     async def get_loop_mode(self, chat_id: int) -> str:
         """Get loop mode for a chat. Returns 'normal', 'loop_all', or 'loop_one'."""
-        doc = await self.chatsdb.find_one({"_id": chat_id})
-        if doc and "loop_mode" in doc:
-            return doc["loop_mode"]
-        return "normal"
+        return (await self.settings.get(chat_id)).loop_mode
 
     async def set_loop_mode(self, chat_id: int, mode: str) -> None:
         """Set loop mode for a chat. Mode should be 'normal', 'loop_all', or 'loop_one'."""
-        await self.chatsdb.update_one(
-            {"_id": chat_id},
-            {"$set": {"loop_mode": mode}},
-            upsert=True,
-        )
+        await self.settings.set(chat_id, loop_mode=mode)
 
     # VIDEO MODE METHODS
     async def get_video_mode(self, chat_id: int) -> bool:
         """Get video mode for a chat. Returns True if video enabled, False for audio only."""
-        doc = await self.chatsdb.find_one({"_id": chat_id})
-        if doc and "video_mode" in doc:
-            return doc["video_mode"]
-        return True  # Default: video enabled
+        return (await self.settings.get(chat_id)).video_mode
 
     async def set_video_mode(self, chat_id: int, enabled: bool) -> None:
         """Set video mode for a chat."""
-        await self.chatsdb.update_one(
-            {"_id": chat_id},
-            {"$set": {"video_mode": enabled}},
-            upsert=True,
-        )
+        await self.settings.set(chat_id, video_mode=enabled)
 
     # VIDEO QUALITY METHODS
     async def get_video_quality(self, chat_id: int) -> str:
         """Get video quality for a chat. Returns '360p', '480p', '720p', or '1080p'."""
-        doc = await self.chatsdb.find_one({"_id": chat_id})
-        if doc and "video_quality" in doc:
-            return doc["video_quality"]
-        return "720p"  # Default quality
+        return (await self.settings.get(chat_id)).video_quality
 
     async def set_video_quality(self, chat_id: int, quality: str) -> None:
         """Set video quality for a chat."""
-        await self.chatsdb.update_one(
-            {"_id": chat_id},
-            {"$set": {"video_quality": quality}},
-            upsert=True,
-        )
+        await self.settings.set(chat_id, video_quality=quality)
 
     # DRAMA MODE METHODS
     async def get_drama_mode(self, chat_id: int) -> bool:
         """Get drama mode for a chat. Returns True if admin only, False if everyone."""
-        doc = await self.chatsdb.find_one({"_id": chat_id})
-        if doc and "drama_mode" in doc:
-            return doc["drama_mode"]
-        return True  # Default: admin only
+        return (await self.settings.get(chat_id)).drama_mode
 
     async def set_drama_mode(self, chat_id: int, admin_only: bool) -> None:
         """Set drama mode for a chat."""
-        await self.chatsdb.update_one(
-            {"_id": chat_id},
-            {"$set": {"drama_mode": admin_only}},
-            upsert=True,
-        )
+        await self.settings.set(chat_id, drama_mode=admin_only)
 
     # SUDO METHODS
     async def add_sudo(self, user_id: int) -> None:
@@ -357,32 +358,33 @@ class MongoDB:
 
     async def add_user(self, user_id: int) -> None:
         if not await self.is_user(user_id):
-            self.users.append(user_id)
+            self.users.add(user_id)
             await self.usersdb.insert_one({"_id": user_id})
 
     async def rm_user(self, user_id: int) -> None:
         if await self.is_user(user_id):
-            self.users.remove(user_id)
+            self.users.discard(user_id)
             await self.usersdb.delete_one({"_id": user_id})
 
-    async def get_users(self) -> list:
+    async def get_users(self) -> set[int]:
         if not self.users:
-            self.users.extend([user["_id"] async for user in self.usersdb.find()])
+            self.users.update([user["_id"] async for user in self.usersdb.find({}, {"_id": 1})])
         return self.users
 
     # PM WARNINGS METHODS
     async def get_pm_warns(self, user_id: int) -> int:
         """Get number of PM warnings for a user."""
-        if user_id not in self.pm_warns:
+        async def load() -> int:
             doc = await self.pm_warnsdb.find_one({"_id": user_id})
-            self.pm_warns[user_id] = doc.get("warns", 0) if doc else 0
-        return self.pm_warns[user_id]
+            return doc.get("warns", 0) if doc else 0
+
+        return await self.pm_warns.get_or_load(user_id, load)
 
     async def add_pm_warn(self, user_id: int) -> int:
         """Add a PM warning to a user and return new count."""
         current = await self.get_pm_warns(user_id)
         new_count = current + 1
-        self.pm_warns[user_id] = new_count
+        self.pm_warns.set(user_id, new_count)
         await self.pm_warnsdb.update_one(
             {"_id": user_id},
             {"$set": {"warns": new_count}},
@@ -404,43 +406,43 @@ class MongoDB:
     # PM CUSTOM MESSAGES METHODS
     async def get_pm_messages(self) -> dict:
         """Get custom PM messages."""
-        if not self.pm_messages:
-            doc = await self.pm_messagesdb.find_one({"_id": "custom_messages"})
-            if doc:
-                self.pm_messages = {
-                    "warn": doc.get("warn"),
-                    "block": doc.get("block")
-                }
-            else:
-                self.pm_messages = {"warn": None, "block": None}
-        return self.pm_messages
+        async def load() -> dict:
+            doc = await self.pm_messagesdb.find_one({"_id": "custom_messages"}) or {}
+            return {"warn": doc.get("warn"), "block": doc.get("block")}
+
+        return await self.pm_messages.get_or_load("custom_messages", load)
 
     async def set_pm_warn_msg(self, message: str) -> None:
         """Set custom PM warning message."""
-        self.pm_messages["warn"] = message
         await self.pm_messagesdb.update_one(
             {"_id": "custom_messages"},
             {"$set": {"warn": message}},
             upsert=True
         )
+        self.pm_messages.pop("custom_messages")
 
     async def set_pm_block_msg(self, message: str) -> None:
         """Set custom PM block message."""
-        self.pm_messages["block"] = message
         await self.pm_messagesdb.update_one(
             {"_id": "custom_messages"},
             {"$set": {"block": message}},
             upsert=True
         )
+        self.pm_messages.pop("custom_messages")
 
     async def clear_pm_messages(self) -> None:
         """Clear custom PM messages (reset to default)."""
-        self.pm_messages = {"warn": None, "block": None}
+        self.pm_messages.set("custom_messages", {"warn": None, "block": None})
         await self.pm_messagesdb.delete_one({"_id": "custom_messages"})
 
     # STATS TRACKING METHODS
     async def add_stats(self, track_id: str, title: str, duration: str, user_id: int, chat_id: int, thumbnail: str = None, stream_type: str = "music") -> None:
-        """Add or update play statistics."""
+        """Add or update play statistics.
+
+        Counters are buffered in memory and written in batches by `self.stats`.
+        """
+        from datetime import datetime
+
         update_data = {
             "title": title, 
             "duration": duration,
@@ -449,42 +451,39 @@ class MongoDB:
         if thumbnail:
             update_data["thumbnail"] = thumbnail
 
-        await self.statsdb.update_one(
-            {"_id": track_id},
-            {
-                "$set": update_data,
-                "$inc": {
-                    "count": 1,
-                    f"users.{user_id}": 1,
-                    f"chats.{chat_id}": 1
-                }
-            },
-            upsert=True
+        # Track documents only keep aggregate fields, per-user and per-chat
+        # counts live in their own bucket documents.
+        self.stats.add("stats", track_id, {"count": 1}, update_data)
+        self.stats.add(
+            "user_track_plays",
+            f"{user_id}:{track_id}",
+            {"count": 1},
+            {"user_id": user_id, "track_id": track_id},
         )
-        
-        # Add to group-specific user stats
-        await self.db.group_stats.update_one(
-            {"_id": chat_id},
-            {"$inc": {f"users.{user_id}": 1}},
-            upsert=True
+        self.stats.add(
+            "chat_track_plays",
+            f"{chat_id}:{track_id}",
+            {"count": 1},
+            {"chat_id": chat_id, "track_id": track_id, **update_data},
         )
-
-        # Add to daily stats
-        from datetime import datetime
-        today = datetime.now().strftime("%Y-%m-%d")
-        await self.dailydb.update_one(
-            {"_id": today},
-            {"$inc": {"count": 1}},
-            upsert=True
+        self.stats.add(
+            "chat_user_plays",
+            f"{chat_id}:{user_id}",
+            {"count": 1},
+            {"chat_id": chat_id, "user_id": user_id},
         )
 
-        # Add to hourly stats (Peak Hours)
-        current_hour = datetime.now().hour # 0-23
-        await self.hourlydb.update_one(
-            {"_id": today},
-            {"$inc": {f"hours.{current_hour}": 1}},
-            upsert=True
-        )
+        # Materialized leaderboards
+        self.stats.add("user_plays", user_id, {"count": 1})
+        self.stats.add("chat_plays", chat_id, {"count": 1})
+
+        # Add to daily and hourly stats (Peak Hours)
+        now = datetime.now()
+        today = now.strftime("%Y-%m-%d")
+        self.stats.add("daily_stats", today, {"count": 1})
+        self.stats.add("hourly_stats", today, {f"hours.{now.hour}": 1})
+
+        self.stats.add("platform_counters", "platforms", {self.get_platform(track_id, stream_type): 1})
 
     async def get_global_tops(self, limit: int = 10) -> dict:
         """Get top tracks globally."""
@@ -508,162 +507,274 @@ class MongoDB:
 
     async def get_top_users(self, limit: int = 10) -> dict:
         """Get most active users globally."""
-        pipeline = [
-            {"$project": {"users": {"$objectToArray": "$users"}}},
-            {"$unwind": "$users"},
-            {"$group": {"_id": "$users.k", "count": {"$sum": "$users.v"}}},
-            {"$sort": {"count": -1}},
-            {"$limit": limit}
-        ]
-        cursor = self.statsdb.aggregate(pipeline)
-        results = {}
-        async for doc in cursor:
-            try:
-                user_id = int(doc["_id"])
-                results[user_id] = doc["count"]
-            except (ValueError, TypeError):
-                continue
-        return results
+        cursor = self.userplaysdb.find().sort("count", -1).limit(limit)
+        return {doc["_id"]: doc["count"] async for doc in cursor}
 
     async def get_top_chats(self, limit: int = 10) -> dict:
         """Get most active groups globally."""
-        pipeline = [
-            {"$project": {"chats": {"$objectToArray": "$chats"}}},
-            {"$unwind": "$chats"},
-            {"$group": {"_id": "$chats.k", "count": {"$sum": "$chats.v"}}},
-            {"$sort": {"count": -1}},
-            {"$limit": limit}
-        ]
-        results = {}
-        cursor = self.statsdb.aggregate(pipeline)
-        docs = await cursor.to_list(length=None)
-        for doc in docs:
-            try:
-                chat_id = int(doc["_id"])
-                results[chat_id] = doc["count"]
-            except (ValueError, TypeError):
-                continue
-        return results
+        cursor = self.chatplaysdb.find().sort("count", -1).limit(limit)
+        return {doc["_id"]: doc["count"] async for doc in cursor}
+
+    async def get_chat_rank(self, chat_id: int) -> tuple[int | None, int]:
+        """Get a group's global rank by total plays.
+
+        Counts the chats with more plays on the `chat_plays` count index, so the
+        cost does not depend on how many groups are ranked.
+
+        Returns:
+            tuple[int | None, int]: The rank (None if the chat has no plays) and
+            the total number of ranked groups.
+        """
+        total = await self.chatplaysdb.estimated_document_count()
+        doc = await self.chatplaysdb.find_one({"_id": chat_id})
+        if not doc:
+            return None, total
+        ahead = await self.chatplaysdb.count_documents({"count": {"$gt": doc["count"]}})
+        return ahead + 1, total
+
+    async def backfill_leaderboards(self) -> tuple[int, int]:
+        """Rebuild `user_plays` and `chat_plays` from the bucket collections.
+
+        Returns:
+            tuple[int, int]: The number of users and chats in the leaderboards.
+        """
+        await self.migrate_stats_schema()
+        await self.stats.flush()
+        for source, field, target in (
+            (self.usertrackdb, "user_id", "user_plays"),
+            (self.chattrackdb, "chat_id", "chat_plays"),
+        ):
+            pipeline = [
+                {"$group": {"_id": f"${field}", "count": {"$sum": "$count"}}},
+                {"$match": {"_id": {"$ne": None}}},
+                {"$merge": {"into": target, "whenMatched": "replace", "whenNotMatched": "insert"}},
+            ]
+            await source.aggregate(pipeline).to_list(length=None)
+
+        return (
+            await self.userplaysdb.estimated_document_count(),
+            await self.chatplaysdb.estimated_document_count(),
+        )
 
     async def get_group_stats(self, chat_id: int, limit: int = 10) -> dict:
         """Get top tracks for a specific group."""
         query = {
-            f"chats.{chat_id}": {"$exists": True},
+            "chat_id": chat_id,
             "duration": {
                 "$nin": ["Live", "Unknown"],
                 "$not": {"$regex": "^Stream|Live$", "$options": "i"}
             },
             "thumbnail": {"$exists": True, "$ne": None}
         }
-        cursor = self.statsdb.find(query).sort(f"chats.{chat_id}", -1).limit(limit)
+        cursor = self.chattrackdb.find(query).sort("count", -1).limit(limit)
         results = {}
         async for doc in cursor:
-            chats = doc.get("chats", {})
-            count = chats.get(str(chat_id), 0)
-            if count > 0:
-                results[doc["_id"]] = {
-                    "spot": count,
-                    "title": doc.get("title", "Unknown"),
-                    "duration": doc.get("duration", "0:00")
-                }
+            results[doc["track_id"]] = {
+                "spot": doc["count"],
+                "title": doc.get("title", "Unknown"),
+                "duration": doc.get("duration", "0:00")
+            }
         return results
 
     async def get_group_top_users(self, chat_id: int, limit: int = 10) -> dict:
         """Get top users for a specific group."""
-        doc = await self.db.group_stats.find_one({"_id": chat_id})
-        if not doc or "users" not in doc:
-            return {}
-        
-        users = doc["users"]
-        # Sort by count desc and take top limit
-        sorted_users = dict(sorted(users.items(), key=lambda item: item[1], reverse=True)[:limit])
-        return sorted_users
+        cursor = self.chatuserdb.find({"chat_id": chat_id}).sort("count", -1).limit(limit)
+        return {doc["user_id"]: doc["count"] async for doc in cursor}
+
+    @staticmethod
+    def _map_items(counts: dict | None):
+        """Yield (id, count) pairs of a legacy `users`/`chats` map."""
+        for key, count in (counts or {}).items():
+            if key.lstrip("-").isdigit() and isinstance(count, int):
+                yield int(key), count
+
+    @staticmethod
+    def _bucket_op(_id: str, fields: dict, count: int) -> UpdateOne:
+        """Add a legacy count to a bucket exactly once.
+
+        Buckets already credited carry `migrated`, so the filter misses and the
+        upsert fails with a duplicate key, which `_bulk_buckets` resolves.
+        """
+        return UpdateOne(
+            {"_id": _id, "migrated": {"$ne": True}},
+            {"$inc": {"count": count}, "$set": {**fields, "migrated": True}},
+            upsert=True,
+        )
+
+    @staticmethod
+    async def _bulk_buckets(collection, ops: list, chunk: int = 1000) -> None:
+        for i in range(0, len(ops), chunk):
+            batch = ops[i:i + chunk]
+            try:
+                await collection.bulk_write(batch, ordered=False)
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                if not errors or any(err.get("code") != 11000 for err in errors):
+                    raise
+                # A duplicate key means the bucket exists: either it was credited
+                # already, or a stats flush created it after the filter missed.
+                # The server does not retry such upserts, so update the existing
+                # buckets without upsert; the filter still skips credited ones.
+                await collection.bulk_write(
+                    [UpdateOne(batch[err["index"]]._filter, batch[err["index"]]._doc) for err in errors],
+                    ordered=False,
+                )
+
+    async def migrate_stats_schema(self) -> int:
+        """Move the embedded play maps into the bucket collections.
+
+        `stats.users` / `stats.chats` become `user_track_plays` / `chat_track_plays`
+        and `group_stats.users` becomes `chat_user_plays`. The maps are no longer
+        written, so they are frozen and their counts are added on top of the plays
+        recorded since. Each document is unset once copied, and every bucket is
+        credited at most once, so an interrupted run can simply be started again.
+
+        Returns:
+            int: The number of documents migrated.
+        """
+        async with self._migration_lock:
+            if not self.stats_migration_pending:
+                return 0
+
+            logger.info("Migrating stats to the bucketed schema...")
+            migrated = 0
+            legacy = {"$or": [{"users": {"$exists": True}}, {"chats": {"$exists": True}}]}
+            async for doc in self.statsdb.find(legacy):
+                track_id = doc["_id"]
+                meta = {
+                    key: doc[key] for key in ("title", "duration", "stream_type", "thumbnail")
+                    if doc.get(key) is not None
+                }
+                await self._bulk_buckets(self.usertrackdb, [
+                    self._bucket_op(f"{user_id}:{track_id}", {"user_id": user_id, "track_id": track_id}, count)
+                    for user_id, count in self._map_items(doc.get("users"))
+                ])
+                await self._bulk_buckets(self.chattrackdb, [
+                    self._bucket_op(f"{chat_id}:{track_id}", {"chat_id": chat_id, "track_id": track_id, **meta}, count)
+                    for chat_id, count in self._map_items(doc.get("chats"))
+                ])
+                await self.statsdb.update_one({"_id": track_id}, {"$unset": {"users": "", "chats": ""}})
+                migrated += 1
+                if migrated % 1000 == 0:
+                    logger.info(f"Stats migration: {migrated} tracks done.")
+
+            async for doc in self.db.group_stats.find({"users": {"$exists": True}}):
+                chat_id = doc["_id"]
+                await self._bulk_buckets(self.chatuserdb, [
+                    self._bucket_op(f"{chat_id}:{user_id}", {"chat_id": chat_id, "user_id": user_id}, count)
+                    for user_id, count in self._map_items(doc.get("users"))
+                ])
+                await self.db.group_stats.delete_one({"_id": chat_id})
+                migrated += 1
+
+            await self.cache.update_one(
+                {"_id": "stats_schema"},
+                {"$set": {"version": self.STATS_SCHEMA}},
+                upsert=True,
+            )
+            self.stats_migration_pending = False
+            logger.info(f"Stats migration completed ({migrated} documents).")
+            return migrated
 
     async def increment_queries(self) -> None:
         """Increment total queries counter."""
-        await self.queriesdb.update_one(
-            {"_id": "total_queries"},
-            {"$inc": {"count": 1}},
-            upsert=True
-        )
+        self.stats.add("queries", "total_queries", {"count": 1})
 
     async def get_queries(self) -> int:
         """Get total queries count."""
         doc = await self.queriesdb.find_one({"_id": "total_queries"})
         return doc.get("count", 0) if doc else 0
 
+    async def _get_days(self, collection, days: int) -> list[tuple[str, dict]]:
+        """Get the documents of the last N days (oldest first) in one query.
+
+        Past days no longer change, so they are memoized and only the missing
+        days plus today are read. A past day is memoized only after the buffered
+        increments are flushed, so late plays of that day are included. Days
+        without a document map to an empty dict.
+        """
+        from datetime import datetime, timedelta
+
+        days = max(1, min(days, self.MAX_HISTORY_DAYS))
+        now = datetime.now()
+        today = now.strftime("%Y-%m-%d")
+        dates = [(now - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)][::-1]
+        oldest = (now - timedelta(days=self.MAX_HISTORY_DAYS)).strftime("%Y-%m-%d")
+
+        memo = self._day_memo.setdefault(collection.name, {})
+        for date in [d for d in memo if d < oldest]:
+            memo.pop(date)
+
+        missing = [date for date in dates if date not in memo]
+        if len(missing) > 1 or missing[0] != today:
+            await self.stats.flush()
+        found = {doc["_id"]: doc async for doc in collection.find({"_id": {"$in": missing}})}
+        for date in missing:
+            if date < today:
+                memo[date] = found.get(date, {})
+
+        return [(date, memo[date] if date in memo else found.get(date, {})) for date in dates]
+
     async def get_daily_play_count(self, days: int = 7) -> list:
         """Get daily play counts for the last N days."""
-        from datetime import datetime, timedelta
-        
-        results = []
-        today = datetime.now()
-        
-        for i in range(days):
-            date = (today - timedelta(days=i)).strftime("%Y-%m-%d")
-            doc = await self.dailydb.find_one({"_id": date})
-            count = doc.get("count", 0) if doc else 0
-            results.append({
-                "date": date,
-                "play_count": count
-            })
-            
-        return results[::-1]  # Return chronologically (oldest first)
+        return [
+            {"date": date, "play_count": doc.get("count", 0)}
+            for date, doc in await self._get_days(self.dailydb, days)
+        ]
 
     async def get_peak_hours(self, days: int = 7) -> list:
         """Get aggregated play counts per hour (0-23) for the last N days."""
-        from datetime import datetime, timedelta
-        
-        # Initialize 24 hours with 0
         hourly_counts = [0] * 24
-        
-        today = datetime.now()
-        for i in range(days):
-            date = (today - timedelta(days=i)).strftime("%Y-%m-%d")
-            doc = await self.hourlydb.find_one({"_id": date})
-            if doc and "hours" in doc:
-                hours_data = doc["hours"]
-                for hour, count in hours_data.items():
-                    try:
-                        h = int(hour)
-                        if 0 <= h < 24:
-                            hourly_counts[h] += count
-                    except:
-                        pass
+        for _, doc in await self._get_days(self.hourlydb, days):
+            for hour, count in doc.get("hours", {}).items():
+                try:
+                    h = int(hour)
+                    if 0 <= h < 24:
+                        hourly_counts[h] += count
+                except:
+                    pass
         
         return hourly_counts
 
+    @staticmethod
+    def get_platform(track_id: str, stream_type: str | None = None) -> str:
+        """Classify a played item into one of `PLATFORMS`.
+
+        Uses the stream type recorded at play time and falls back to track id
+        heuristics for stats documents written before it existed.
+        """
+        if stream_type in ("music", "live"):
+            return "youtube"
+        if stream_type == "file":
+            return "other" if track_id.startswith("drama_") else "local"
+
+        track_id_lower = track_id.lower()
+        if "spotify" in track_id_lower:
+            return "spotify"
+        if "soundcloud" in track_id_lower:
+            return "soundcloud"
+        if track_id.startswith("file://") or track_id.startswith("/"):
+            return "local"
+        # YouTube video IDs are 11 chars alphanumeric
+        if (len(track_id) == 11 and track_id.isalnum()) or "youtube" in track_id_lower or "youtu.be" in track_id_lower:
+            return "youtube"
+        return "other"
+
     async def get_platform_stats(self) -> dict:
         """Get distribution of platforms (YouTube, Spotify, SoundCloud, etc.)."""
-        platforms = {"youtube": 0, "spotify": 0, "soundcloud": 0, "local": 0, "other": 0}
-        
-        # Aggregate from statsdb
-        cursor = self.statsdb.find({})
-        async for doc in cursor:
-            track_id = doc.get("_id", "")
-            count = doc.get("count", 0)
-            
-            # Platform detection logic
-            if not track_id:
-                continue
-            
-            track_id_lower = track_id.lower()
-            if "spotify" in track_id_lower or track_id.startswith("spotify:"):
-                platforms["spotify"] += count
-            elif "soundcloud" in track_id_lower:
-                platforms["soundcloud"] += count
-            elif track_id.startswith("file://") or track_id.startswith("/"):
-                platforms["local"] += count
-            elif len(track_id) == 11 and track_id.isalnum():
-                # YouTube video IDs are 11 chars alphanumeric
-                platforms["youtube"] += count
-            else:
-                # Check if it's a YouTube URL pattern
-                if "youtube" in track_id_lower or "youtu.be" in track_id_lower:
-                    platforms["youtube"] += count
-                else:
-                    platforms["other"] += count
-        
+        doc = await self.platformdb.find_one({"_id": "platforms"}) or {}
+        return {platform: doc.get(platform, 0) for platform in self.PLATFORMS}
+
+    async def backfill_platform_stats(self) -> dict:
+        """Rebuild the platform counters from the play counts in `stats`."""
+        await self.stats.flush()
+        platforms = dict.fromkeys(self.PLATFORMS, 0)
+        async for doc in self.statsdb.find({}, {"count": 1, "stream_type": 1}):
+            track_id = str(doc.get("_id") or "")
+            if track_id:
+                platforms[self.get_platform(track_id, doc.get("stream_type"))] += doc.get("count", 0)
+
+        await self.platformdb.replace_one({"_id": "platforms"}, platforms, upsert=True)
         return platforms
 
     # USER PLAYLIST METHODS
@@ -710,59 +821,120 @@ class MongoDB:
         )
 
 
-    async def migrate_coll(self) -> None:
+    @staticmethod
+    def _normalize_doc(doc: dict, id_field: str) -> dict | None:
+        """Convert an old ObjectId-keyed document to the int-keyed format."""
         from bson import ObjectId
-        logger.info("Migrating users and chats from old collections...")
 
-        musers, mchats, done = [], [], []
-        ulist = [user async for user in self.db.tgusersdb.find()]
-        ulist.extend([user async for user in self.usersdb.find()])
-
-        for user in ulist:
-            if isinstance(user.get("_id"), ObjectId):
-                user_id = int(user["user_id"])
-                if user_id in done:
-                    continue
-                done.append(user_id)
-                musers.append(user)
-            else:
-                user_id = int(user["_id"])
-                if user_id in done:
-                    continue
-                done.append(user_id)
-                musers.append({"_id": user_id})
-        await self.usersdb.drop()
-        await self.db.tgusersdb.drop()
-        if musers:
-            await self.usersdb.insert_many(musers)
-
-        async for chat in self.chatsdb.find():
-            if isinstance(chat.get("_id"), ObjectId):
-                chat_id = int(chat["chat_id"])
-                if chat_id in mchats:
-                    continue
-                done.append(chat_id)
-                mchats.append(chat)
-            else:
-                chat_id = int(chat["_id"])
-                if chat_id in done:
-                    continue
-                done.append(chat_id)
-                mchats.append({"_id": chat_id})
-        await self.chatsdb.drop()
-        if mchats:
-            await self.chatsdb.insert_many(mchats)
-
-        await self.cache.insert_one({"_id": "migrated"})
+        try:
+            if isinstance(doc.get("_id"), ObjectId):
+                return {"_id": int(doc[id_field])}
+            return {**doc, "_id": int(doc["_id"])}
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    async def _rewrite_coll(self, name: str, sources: list, id_field: str) -> int:
+        """Rewrite collection `name` from `sources`, one document per id.
+
+        Documents are streamed into `<name>_migrating` in unordered batches and
+        the result is renamed over `name`, so the original data stays in place
+        until it is replaced atomically. If the process dies partway through,
+        the next run reuses the temporary collection and skips the ids it
+        already holds.
+
+        Returns:
+            int: The number of documents in the rewritten collection.
+        """
+        tmp = self.db[f"{name}_migrating"]
+        seen = {doc["_id"] async for doc in tmp.find({}, {"_id": 1})}
+        if seen:
+            logger.info(f"Resuming {name} migration with {len(seen)} documents already copied.")
+
+        scanned, batch = 0, []
+        for source in sources:
+            async for doc in source.find(batch_size=self.MIGRATION_BATCH):
+                scanned += 1
+                doc = self._normalize_doc(doc, id_field)
+                if doc and doc["_id"] not in seen:
+                    seen.add(doc["_id"])
+                    batch.append(doc)
+                if len(batch) >= self.MIGRATION_BATCH:
+                    await self._insert_batch(tmp, batch)
+                    batch = []
+                    logger.info(f"Migrating {name}: {scanned} scanned, {len(seen)} unique.")
+        await self._insert_batch(tmp, batch)
+
+        if seen:
+            await tmp.rename(name, dropTarget=True)
+        for source in sources:
+            if source.name != name:
+                await source.drop()
+        logger.info(f"Migrated {name}: {scanned} scanned, {len(seen)} unique.")
+        return len(seen)
+
+    @staticmethod
+    async def _insert_batch(collection, docs: list) -> None:
+        if not docs:
+            return
+        try:
+            await collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            # Duplicates are documents copied by an interrupted run.
+            if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                raise
+
+    async def migrate_coll(self) -> None:
+        logger.info("Migrating users and chats from old collections...")
+        await self._rewrite_coll("users", [self.db.tgusersdb, self.usersdb], "user_id")
+        await self._rewrite_coll("chats", [self.chatsdb], "chat_id")
+        await self.cache.update_one({"_id": "migrated"}, {"$set": {"at": time()}}, upsert=True)
         logger.info("Migration completed.")
 
+    async def ensure_indexes(self) -> None:
+        """Create every index declared in `INDEXES` (no-op for existing ones)."""
+        created = 0
+        for collection, indexes in INDEXES.items():
+            for keys, options in indexes:
+                try:
+                    await self.db[collection].create_index(keys, **options)
+                    created += 1
+                except Exception as e:
+                    logger.warning(f"Failed to ensure index {keys} on {collection}: {e}")
+        logger.info(f"Database indexes ensured ({created} total).")
+
+    async def audit_queries(self) -> list[dict]:
+        """Run explain() on the hot queries and report their plan stages.
+
+        Returns:
+            list[dict]: One entry per query with its name, collection, plan
+            stages and whether the winning plan contains a COLLSCAN.
+        """
+        report = []
+        for query in hot_queries():
+            cursor = self.db[query["collection"]].find(query["filter"])
+            if query.get("sort"):
+                cursor = cursor.sort(query["sort"])
+            if query.get("limit"):
+                cursor = cursor.limit(query["limit"])
+            try:
+                plan = (await cursor.explain())["queryPlanner"]["winningPlan"]
+                stages = plan_stages(plan)
+                report.append({**query, "stages": sorted(stages), "collscan": "COLLSCAN" in stages})
+            except Exception as e:
+                report.append({**query, "stages": [], "collscan": None, "error": str(e)})
+        return report
+
     async def load_cache(self) -> None:
         doc = await self.cache.find_one({"_id": "migrated"})
         if not doc:
             await self.migrate_coll()
 
+        schema = await self.cache.find_one({"_id": "stats_schema"}) or {}
+        self.stats_migration_pending = schema.get("version", 1) < self.STATS_SCHEMA
+
         await self.get_chats()
         await self.get_users()
         await self.get_blacklisted(True)
+        await self.active_calls.load()
         await self.get_logger()
         logger.info("Database cache loaded.")
@@ -0,0 +1,138 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+
+import asyncio
+import os
+from collections import deque
+
+from delta import config, db, logger, queue, yt
+from delta.core.downloads import Priority
+from delta.helpers import Track
+
+
+class Prefetcher:
+    def __init__(self, depth: int, budget: int):
+        """
+        Keeps the next tracks of every chat's queue downloaded ahead of time.
+
+        Runs whenever a queue changes and downloads the next `depth` YouTube
+        tracks at PREFETCH priority, following the chat's loop mode: nothing
+        for loop_one, wrapping around the queue for loop_all. Nothing is
+        prefetched while the downloads directory holds more than `budget`
+        bytes.
+
+        play_next reports every transition, which gives the hit rate (the
+        track was on disk already) and the gap between two tracks.
+
+        Args:
+            depth (int): Tracks to keep ready after the current one, 0 disables.
+            budget (int): Size of the downloads directory above which prefetching stops.
+        """
+        self.depth = depth
+        self.budget = budget
+        self._dirty: set[int] = set()
+        self._tasks: dict[int, asyncio.Task] = {}
+        self._fetching: dict[tuple, asyncio.Task] = {}
+        self.prefetched = 0
+        self.failed = 0
+        self.over_budget = 0
+        self.hits = 0
+        self.misses = 0
+        self.gaps: deque[float] = deque(maxlen=200)
+        if depth > 0:
+            queue.subscribe(self.changed)
+
+    def changed(self, chat_id: int) -> None:
+        """Queue listener, syncs the chat once per burst of changes."""
+        self._dirty.add(chat_id)
+        if chat_id in self._tasks:
+            return
+        try:
+            task = asyncio.get_running_loop().create_task(self._run(chat_id))
+        except RuntimeError:
+            return
+        self._tasks[chat_id] = task
+
+    async def _run(self, chat_id: int) -> None:
+        try:
+            while chat_id in self._dirty:
+                self._dirty.discard(chat_id)
+                await self._sync(chat_id)
+        except Exception as e:
+            logger.warning(f"Prefetch for {chat_id} failed: {e}")
+        finally:
+            self._tasks.pop(chat_id, None)
+
+    async def upcoming(self, chat_id: int) -> list[Track]:
+        """The tracks that will play after the current one, in order."""
+        items = queue.get_queue(chat_id)
+        if len(items) < 2:
+            return []
+        loop_mode = await db.get_loop_mode(chat_id)
+        if loop_mode == "loop_one":
+            return []
+        upcoming = items[1:] + items[:1] if loop_mode == "loop_all" else items[1:]
+        return [item for item in upcoming[:self.depth] if isinstance(item, Track)]
+
+    async def _sync(self, chat_id: int) -> None:
+        wanted = [
+            track for track in await self.upcoming(chat_id)
+            if not track.file_path and track.duration_sec <= config.DURATION_LIMIT
+        ]
+        if not wanted:
+            return
+        if await asyncio.to_thread(self._usage) >= self.budget:
+            self.over_budget += 1
+            logger.debug(f"Downloads over the prefetch budget, skipping {chat_id}.")
+            return
+
+        for track in wanted:
+            key = (chat_id, track.id, track.video)
+            if key not in self._fetching:
+                task = asyncio.create_task(self._fetch(chat_id, track))
+                self._fetching[key] = task
+                task.add_done_callback(lambda _, key=key: self._fetching.pop(key, None))
+
+    async def _fetch(self, chat_id: int, track: Track) -> None:
+        path = await yt.download(track.id, video=track.video, priority=Priority.PREFETCH, chat_id=chat_id)
+        if not path:
+            self.failed += 1
+            return
+        self.prefetched += 1
+        if not track.file_path:
+            track.file_path = path
+
+    @staticmethod
+    def _usage() -> int:
+        total = 0
+        with os.scandir("downloads") as entries:
+            for entry in entries:
+                if entry.is_file():
+                    total += entry.stat().st_size
+        return total
+
+    def record(self, hit: bool, gap: float) -> None:
+        """A track started after the previous one ended, `gap` seconds later."""
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        self.gaps.append(gap)
+
+    def info(self) -> dict:
+        transitions = self.hits + self.misses
+        gaps = sorted(self.gaps)
+        return {
+            "depth": self.depth,
+            "in_flight": len(self._fetching),
+            "prefetched": self.prefetched,
+            "failed": self.failed,
+            "over_budget": self.over_budget,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / transitions, 4) if transitions else 0.0,
+            "gap_avg_ms": round(sum(gaps) / len(gaps) * 1000, 1) if gaps else 0.0,
+            "gap_p95_ms": round(gaps[int(len(gaps) * 0.95)] * 1000, 1) if gaps else 0.0,
+        }
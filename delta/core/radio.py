@@ -0,0 +1,253 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+
+import asyncio
+import ipaddress
+from collections import deque
+from urllib.parse import urlparse
+
+from pytgcalls import PyTgCalls, exceptions, types
+
+from delta import db, logger, queue
+
+# 10 ms of 48 kHz stereo s16le, the frame external audio is sent in.
+FRAME = 48000 * 2 * 2 // 100
+
+SCHEMES = ("http", "https", "rtmp", "rtmps")
+# Network protocols ffmpeg may open, so a source can never reach files or concat:.
+PROTOCOLS = "http,https,tcp,tls,crypto,rtmp,rtmps,rtmpt,rtmpts"
+
+
+def valid_url(url: str) -> bool:
+    """Whether `url` is an absolute http(s)/rtmp(s) URL to a public host."""
+    try:
+        parsed = urlparse(url)
+        host = parsed.hostname
+    except ValueError:
+        return False
+    if parsed.scheme not in SCHEMES or not host or host == "localhost":
+        return False
+    try:
+        return ipaddress.ip_address(host).is_global
+    except ValueError:
+        return True
+
+
+class Station:
+    def __init__(self, url: str, ring_frames: int):
+        """
+        One decoder for a source, fanned out to every chat listening to it.
+
+        ffmpeg decodes the source once, in real time, into a ring buffer of
+        10 ms PCM frames. A sender task hands every frame to all listening
+        calls, whichever assistant they run on. If sending falls behind, the
+        oldest frames are dropped so listeners stay live instead of lagging.
+
+        Args:
+            url (str): An http(s) or rtmp(s) radio, m3u8 or file URL.
+            ring_frames (int): Frames kept between the decoder and the sender.
+        """
+        self.url = url
+        self.listeners: dict[int, PyTgCalls] = {}
+        self.ring: deque[bytes] = deque(maxlen=ring_frames)
+        self.seq = 0
+        self.sent = 0
+        self.dropped = 0
+        self.process: asyncio.subprocess.Process | None = None
+        self.tasks: list[asyncio.Task] = []
+        self.watcher: asyncio.Task | None = None
+        self.ended = asyncio.Event()
+        self._new = asyncio.Event()
+
+    async def start(self) -> None:
+        reconnect = (
+            ["-reconnect", "1", "-reconnect_streamed", "1", "-reconnect_delay_max", "5"]
+            if self.url.startswith(("http://", "https://"))
+            else []
+        )
+        self.process = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-nostdin", "-v", "error", "-re", *reconnect,
+            "-protocol_whitelist", PROTOCOLS,
+            "-i", self.url,
+            "-vn", "-f", "s16le", "-ac", "2", "-ar", "48000", "pipe:1",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        self.tasks = [asyncio.create_task(self._decode()), asyncio.create_task(self._send())]
+
+    async def wait_audio(self, timeout: float) -> bool:
+        """Wait for the first decoded frame, False if the source gave none in time."""
+        for _ in range(int(timeout * 10)):
+            if self.seq or self.ended.is_set():
+                break
+            await asyncio.sleep(0.1)
+        return self.seq > 0
+
+    async def _decode(self) -> None:
+        try:
+            while True:
+                self.ring.append(await self.process.stdout.readexactly(FRAME))
+                self.seq += 1
+                self._new.set()
+        except asyncio.IncompleteReadError:
+            logger.info(f"Radio source ended: {self.url}")
+        finally:
+            self.ended.set()
+
+    async def _send(self) -> None:
+        cursor = self.seq
+        while True:
+            while cursor >= self.seq:
+                self._new.clear()
+                await self._new.wait()
+            behind = self.seq - cursor
+            if behind > len(self.ring):
+                self.dropped += behind - len(self.ring)
+                behind = len(self.ring)
+            frames = list(self.ring)[-behind:]
+            cursor = self.seq
+            for frame in frames:
+                await self._broadcast(frame)
+
+    async def _broadcast(self, frame: bytes) -> None:
+        listeners = list(self.listeners.items())
+        results = await asyncio.gather(
+            *(
+                client.send_frame(chat_id, types.Device.MICROPHONE, frame)
+                for chat_id, client in listeners
+            ),
+            return_exceptions=True,
+        )
+        for (chat_id, _), result in zip(listeners, results):
+            if isinstance(result, exceptions.NotInCallError):
+                # The call went away without a stop, e.g. the voice chat was closed.
+                self.listeners.pop(chat_id, None)
+        self.sent += 1
+
+    async def close(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+        if self.process and self.process.returncode is None:
+            self.process.kill()
+            await self.process.wait()
+
+
+class Radio:
+    def __init__(self, ring_frames: int = 50):
+        """
+        Shared "radio" streams: one decoder per source for any number of chats.
+
+        Args:
+            ring_frames (int): Frames buffered per station, 10 ms each.
+        """
+        self.ring_frames = ring_frames
+        self.stations: dict[str, Station] = {}
+        self.chats: dict[int, Station] = {}
+        self.pending: dict[str, asyncio.Future] = {}
+
+    def station(self, chat_id: int) -> Station | None:
+        return self.chats.get(chat_id)
+
+    async def join(self, chat_id: int, url: str) -> Station:
+        """Tune a chat's call in to `url`, starting its decoder if nobody listens yet."""
+        if not valid_url(url):
+            raise ValueError("Only public http(s) and rtmp(s) URLs can be played")
+        await self.leave(chat_id)
+        queue.clear(chat_id)
+
+        station = self.stations.get(url) or await self._open(url)
+        if station.ended.is_set():
+            raise RuntimeError("The source has ended")
+
+        client = await db.get_assistant(chat_id)
+        try:
+            await client.play(
+                chat_id=chat_id,
+                stream=types.MediaStream(
+                    media_path=types.ExternalMedia.AUDIO,
+                    audio_parameters=types.AudioQuality.HIGH,
+                ),
+                config=types.GroupCallConfig(auto_start=False),
+            )
+        except Exception:
+            if not station.listeners:
+                await self._close(station)
+            raise
+        station.listeners[chat_id] = client
+        self.chats[chat_id] = station
+        await db.add_call(chat_id)
+        return station
+
+    async def _open(self, url: str) -> Station:
+        """Start a station for `url`, or wait for the one another join is starting."""
+        if url in self.pending:
+            return await asyncio.shield(self.pending[url])
+        future = asyncio.get_running_loop().create_future()
+        self.pending[url] = future
+        station = Station(url, self.ring_frames)
+        try:
+            await station.start()
+            if not await station.wait_audio(15):
+                raise RuntimeError("No audio from the source")
+        except asyncio.CancelledError:
+            await station.close()
+            future.cancel()
+            raise
+        except Exception as e:
+            await station.close()
+            future.set_exception(e)
+            # Retrieved here so a failure nobody else waited for is not logged.
+            future.exception()
+            raise
+        finally:
+            del self.pending[url]
+        self.stations[url] = station
+        station.watcher = asyncio.create_task(self._watch(station))
+        future.set_result(station)
+        return station
+
+    async def leave(self, chat_id: int) -> bool:
+        """Stop feeding a chat. The call itself is left to the caller."""
+        station = self.chats.pop(chat_id, None)
+        if station is None:
+            return False
+        station.listeners.pop(chat_id, None)
+        if not station.listeners:
+            await self._close(station)
+        return True
+
+    async def _watch(self, station: Station) -> None:
+        await station.ended.wait()
+        for chat_id in list(station.listeners):
+            self.chats.pop(chat_id, None)
+            try:
+                await station.listeners[chat_id].leave_call(chat_id, close=False)
+            except Exception:
+                pass
+            await db.remove_call(chat_id)
+        station.listeners.clear()
+        await self._close(station)
+
+    async def _close(self, station: Station) -> None:
+        if self.stations.get(station.url) is station:
+            del self.stations[station.url]
+        await station.close()
+
+    async def close(self) -> None:
+        for station in list(self.stations.values()):
+            await self._close(station)
+        self.chats.clear()
+
+    def info(self) -> list[dict]:
+        return [
+            {
+                "url": station.url,
+                "listeners": len(station.listeners),
+                "frames": station.seq,
+                "sent": station.sent,
+                "dropped": station.dropped,
+            }
+            for station in self.stations.values()
+        ]
@@ -0,0 +1,114 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+
+import asyncio
+from dataclasses import dataclass
+
+from pymongo import DeleteOne, ReplaceOne
+
+from delta import logger
+
+
+@dataclass
+class ActiveCall:
+    chat_id: int
+    playing: bool = True
+    assistant: int = 0
+
+
+class ActiveCallRegistry:
+    def __init__(self, collection):
+        """
+        Authoritative in-memory registry of active voice chats.
+
+        Reads never touch the database. Every change marks the chat dirty and
+        a background task persists the latest state of dirty chats, so the
+        collection is only used to rebuild the registry on boot.
+
+        Args:
+            collection: The `active_calls` collection.
+        """
+        self.collection = collection
+        self.calls: dict[int, ActiveCall] = {}
+        self._dirty: set[int] = set()
+        self._lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+
+    def __contains__(self, chat_id: int) -> bool:
+        return chat_id in self.calls
+
+    def __iter__(self):
+        return iter(list(self.calls))
+
+    def __len__(self) -> int:
+        return len(self.calls)
+
+    def get(self, chat_id: int) -> ActiveCall | None:
+        return self.calls.get(chat_id)
+
+    def keys(self) -> list[int]:
+        return list(self.calls)
+
+    def values(self) -> list[ActiveCall]:
+        return list(self.calls.values())
+
+    def _mark(self, chat_id: int) -> None:
+        self._dirty.add(chat_id)
+        self._wake.set()
+
+    def add(self, chat_id: int, assistant: int = 0) -> None:
+        self.calls[chat_id] = ActiveCall(chat_id=chat_id, assistant=assistant)
+        self._mark(chat_id)
+
+    def remove(self, chat_id: int) -> None:
+        if self.calls.pop(chat_id, None):
+            self._mark(chat_id)
+
+    def set_playing(self, chat_id: int, playing: bool) -> None:
+        call = self.calls.get(chat_id)
+        if call and call.playing != playing:
+            call.playing = playing
+            self._mark(chat_id)
+
+    async def load(self) -> None:
+        """Rebuild the registry from the database."""
+        async for doc in self.collection.find():
+            self.calls[doc["_id"]] = ActiveCall(
+                chat_id=doc["_id"],
+                playing=bool(doc.get("playing")),
+                assistant=doc.get("assistant", 0),
+            )
+        logger.info(f"Restored {len(self.calls)} active call(s).")
+
+    async def flush(self) -> None:
+        """Persist the current state of every dirty chat."""
+        async with self._lock:
+            if not self._dirty:
+                return
+            dirty, self._dirty = self._dirty, set()
+            ops = []
+            for chat_id in dirty:
+                call = self.calls.get(chat_id)
+                if call:
+                    ops.append(ReplaceOne(
+                        {"_id": chat_id},
+                        {"playing": int(call.playing), "assistant": call.assistant},
+                        upsert=True,
+                    ))
+                else:
+                    ops.append(DeleteOne({"_id": chat_id}))
+            try:
+                await self.collection.bulk_write(ops, ordered=False)
+            except Exception as e:
+                logger.warning(f"Failed to persist active calls: {type(e).__name__}")
+                self._dirty |= dirty
+
+    async def run(self) -> None:
+        """Persist changes in the background as they happen."""
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            await asyncio.shield(self.flush())
+            await asyncio.sleep(1)
@@ -0,0 +1,67 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+
+from dataclasses import dataclass, fields
+
+from delta.core.cache import TTLCache
+
+
+@dataclass
+class ChatSettings:
+    chat_id: int
+    admin_play: bool = False
+    cmd_delete: bool = False
+    drama_mode: bool = True
+    loop_mode: str = "normal"
+    video_mode: bool = True
+    video_quality: str = "720p"
+
+    @classmethod
+    def from_doc(cls, chat_id: int, doc: dict | None) -> "ChatSettings":
+        """Build settings from a `chats` document, falling back to defaults."""
+        doc = doc or {}
+        return cls(
+            chat_id=chat_id,
+            **{f.name: doc[f.name] for f in fields(cls) if f.name in doc and f.name != "chat_id"},
+        )
+
+
+class SettingsCache:
+    def __init__(self, chatsdb, maxsize: int = 5000, ttl: int = 3600):
+        """
+        LRU/TTL cache of per-chat settings.
+
+        Each chat document is read once and every getter is served from the
+        cached `ChatSettings`. Setters write through to the database with `$set`.
+
+        Args:
+            chatsdb: The `chats` collection.
+            maxsize (int): Maximum number of chats kept in memory.
+            ttl (int): Seconds after which an entry is reloaded from the database.
+        """
+        self.chatsdb = chatsdb
+        self.cache = TTLCache("settings", maxsize, ttl)
+
+    async def _load(self, chat_id: int) -> ChatSettings:
+        doc = await self.chatsdb.find_one({"_id": chat_id})
+        return ChatSettings.from_doc(chat_id, doc)
+
+    async def get(self, chat_id: int) -> ChatSettings:
+        return await self.cache.get_or_load(chat_id, lambda: self._load(chat_id))
+
+    async def set(self, chat_id: int, **values) -> None:
+        settings = self.cache.get(chat_id, count=False)
+        if settings:
+            for key, value in values.items():
+                setattr(settings, key, value)
+        await self.chatsdb.update_one(
+            {"_id": chat_id},
+            {"$set": values},
+            upsert=True,
+        )
+        if not settings:
+            # Drop a load that may have read the document before this write
+            # landed, including one that started while it was awaited.
+            self.cache.pop(chat_id)
@@ -0,0 +1,704 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+"""
+Embedded storage backend for MongoDB, built on SQLite (WAL mode).
+
+SQLiteClient exposes the subset of the Motor client/database/collection API
+that delta.core.mongo uses, so MongoDB keeps the same public methods on both
+backends. Every collection is a table of JSON documents keyed by `_id`.
+Queries are matched in Python with Mongo semantics, while `_id` lookups and
+fields covered by create_index() are pushed down to SQLite expression indexes.
+TTL indexes (expireAfterSeconds) are honoured by purging expired documents
+of the collection on write, at most once a minute.
+
+All statements run on one worker thread, which serializes access to the
+connection and keeps the event loop free.
+"""
+
+import asyncio
+import json
+import re
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from time import monotonic, time
+from typing import Any
+from uuid import uuid4
+
+from pymongo import DeleteOne, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+_RANGE_OPS = {"$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+# Seconds between two purges of a collection with a TTL index.
+_PURGE_INTERVAL = 60
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), default=str)
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _json_path(key: str) -> str:
+    """SQL expression extracting a dotted field, identical for queries and indexes."""
+    path = "$" + "".join(f'."{part}"' for part in key.split("."))
+    return f"json_extract(doc, '{path}')"
+
+
+def _is_scalar(value: Any) -> bool:
+    return isinstance(value, (int, float, str)) and not isinstance(value, bool)
+
+
+def _is_ops(cond: Any) -> bool:
+    return isinstance(cond, dict) and bool(cond) and all(key.startswith("$") for key in cond)
+
+
+# QUERY MATCHING
+def _values(value: Any, parts: list[str]) -> list:
+    """Resolve a dotted path, descending into arrays like Mongo does."""
+    if not parts:
+        return [value]
+    if isinstance(value, dict):
+        return _values(value[parts[0]], parts[1:]) if parts[0] in value else []
+    if isinstance(value, list):
+        found = []
+        for item in value:
+            if isinstance(item, (dict, list)):
+                found.extend(_values(item, parts))
+        return found
+    return []
+
+
+def _expand(values: list):
+    for value in values:
+        yield value
+        if isinstance(value, list):
+            yield from value
+
+
+def _compare(a: Any, b: Any, op: str) -> bool:
+    # Only numbers with numbers and strings with strings, as in Mongo.
+    if not ((_is_scalar(a) and _is_scalar(b)) and isinstance(a, str) == isinstance(b, str)):
+        return False
+    if op == "$gt":
+        return a > b
+    if op == "$gte":
+        return a >= b
+    if op == "$lt":
+        return a < b
+    return a <= b
+
+
+def _eq(values: list, arg: Any) -> bool:
+    if arg is None and not values:
+        return True
+    return any(value == arg for value in _expand(values))
+
+
+def _match_field(values: list, cond: Any) -> bool:
+    if not _is_ops(cond):
+        return _eq(values, cond)
+
+    for op, arg in cond.items():
+        if op == "$options":
+            continue
+        if op == "$eq":
+            ok = _eq(values, arg)
+        elif op == "$ne":
+            ok = not _eq(values, arg)
+        elif op == "$in":
+            ok = any(_eq(values, item) for item in arg)
+        elif op == "$nin":
+            ok = not any(_eq(values, item) for item in arg)
+        elif op == "$exists":
+            ok = bool(values) == bool(arg)
+        elif op in _RANGE_OPS:
+            ok = any(_compare(value, arg, op) for value in _expand(values))
+        elif op == "$regex":
+            flags = re.IGNORECASE if "i" in cond.get("$options", "") else 0
+            pattern = re.compile(arg, flags)
+            ok = any(isinstance(value, str) and pattern.search(value) for value in _expand(values))
+        elif op == "$not":
+            ok = not _match_field(values, arg)
+        else:
+            raise NotImplementedError(f"Unsupported query operator: {op}")
+        if not ok:
+            return False
+    return True
+
+
+def match(doc: dict, query: dict | None) -> bool:
+    """Whether `doc` matches the Mongo filter `query`."""
+    for key, cond in (query or {}).items():
+        if key == "$or":
+            ok = any(match(doc, sub) for sub in cond)
+        elif key == "$and":
+            ok = all(match(doc, sub) for sub in cond)
+        elif key == "$nor":
+            ok = not any(match(doc, sub) for sub in cond)
+        else:
+            ok = _match_field(_values(doc, key.split(".")), cond)
+        if not ok:
+            return False
+    return True
+
+
+# UPDATES
+def _walk(doc: dict, path: str, create: bool) -> tuple[dict | None, str]:
+    parts = path.split(".")
+    current = doc
+    for part in parts[:-1]:
+        if part not in current:
+            if not create:
+                return None, parts[-1]
+            current[part] = {}
+        current = current[part]
+        if not isinstance(current, dict):
+            return None, parts[-1]
+    return current, parts[-1]
+
+
+def _pull_match(item: Any, cond: Any) -> bool:
+    if _is_ops(cond):
+        return _match_field([item], cond)
+    if isinstance(cond, dict):
+        return isinstance(item, dict) and match(item, cond)
+    return item == cond
+
+
+def apply_update(doc: dict, update: dict, inserting: bool = False) -> bool:
+    """Apply Mongo update operators to `doc` in place. Returns whether it changed."""
+    before = _dumps(doc)
+    for op, fields in update.items():
+        if op == "$setOnInsert" and not inserting:
+            continue
+        for path, arg in fields.items():
+            parent, key = _walk(doc, path, create=op not in ("$unset", "$pull"))
+            if parent is None:
+                continue
+            if op in ("$set", "$setOnInsert"):
+                parent[key] = deepcopy(arg)
+            elif op == "$inc":
+                parent[key] = parent.get(key, 0) + arg
+            elif op == "$max":
+                if key not in parent or _compare(arg, parent[key], "$gt"):
+                    parent[key] = arg
+            elif op == "$min":
+                if key not in parent or _compare(arg, parent[key], "$lt"):
+                    parent[key] = arg
+            elif op == "$unset":
+                parent.pop(key, None)
+            elif op in ("$push", "$addToSet"):
+                items = arg["$each"] if isinstance(arg, dict) and "$each" in arg else [arg]
+                target = parent.setdefault(key, [])
+                for item in items:
+                    if op == "$push" or item not in target:
+                        target.append(deepcopy(item))
+            elif op == "$pull":
+                if isinstance(parent.get(key), list):
+                    parent[key] = [item for item in parent[key] if not _pull_match(item, arg)]
+            else:
+                raise NotImplementedError(f"Unsupported update operator: {op}")
+    return _dumps(doc) != before
+
+
+def _upsert_seed(query: dict) -> dict:
+    """The document an upsert starts from: the equality fields of its filter."""
+    doc = {}
+    for key, cond in query.items():
+        if key.startswith("$") or _is_ops(cond):
+            continue
+        parent, name = _walk(doc, key, create=True)
+        if parent is not None:
+            parent[name] = deepcopy(cond)
+    return doc
+
+
+def _project(doc: dict, projection: dict | None) -> dict:
+    if not projection:
+        return doc
+    include = [key for key, value in projection.items() if value and key != "_id"]
+    if not include:
+        return {key: value for key, value in doc.items() if projection.get(key, 1)}
+
+    out = {"_id": doc["_id"]} if projection.get("_id", 1) and "_id" in doc else {}
+    for key in include:
+        values = _values(doc, key.split("."))
+        if values:
+            parent, name = _walk(out, key, create=True)
+            parent[name] = values[0]
+    return out
+
+
+def _expr(doc: dict, expr: Any) -> Any:
+    if isinstance(expr, str) and expr.startswith("$"):
+        values = _values(doc, expr[1:].split("."))
+        return values[0] if values else None
+    return expr
+
+
+# RESULTS
+@dataclass
+class UpdateResult:
+    matched_count: int = 0
+    modified_count: int = 0
+    upserted_id: Any = None
+
+
+@dataclass
+class DeleteResult:
+    deleted_count: int = 0
+
+
+@dataclass
+class InsertResult:
+    inserted_id: Any = None
+    inserted_ids: list = field(default_factory=list)
+
+
+@dataclass
+class BulkResult:
+    matched_count: int = 0
+    modified_count: int = 0
+    upserted_count: int = 0
+    deleted_count: int = 0
+
+
+class SQLiteCursor:
+    def __init__(self, collection: "SQLiteCollection", query: dict | None, projection: dict | None):
+        self.collection = collection
+        self.query = query or {}
+        self.projection = projection
+        self._sort: list[tuple[str, int]] = []
+        self._limit = 0
+
+    def sort(self, key, direction: int | None = None) -> "SQLiteCursor":
+        self._sort = [(key, direction or 1)] if isinstance(key, str) else list(key)
+        return self
+
+    def limit(self, limit: int) -> "SQLiteCursor":
+        self._limit = limit
+        return self
+
+    async def to_list(self, length: int | None = None) -> list[dict]:
+        limit = min(filter(None, (self._limit, length)), default=0)
+        docs = await self.collection._run(self.collection._find, self.query, self._sort, limit)
+        return [_project(doc, self.projection) for doc in docs]
+
+    async def __aiter__(self):
+        for doc in await self.to_list():
+            yield doc
+
+    async def explain(self) -> dict:
+        return await self.collection._run(self.collection._explain, self.query, self._sort)
+
+
+class SQLiteAggregate:
+    def __init__(self, collection: "SQLiteCollection", pipeline: list[dict]):
+        self.collection = collection
+        self.pipeline = pipeline
+
+    async def to_list(self, length: int | None = None) -> list[dict]:
+        docs = await self.collection._run(self.collection._aggregate, self.pipeline)
+        return docs[:length] if length else docs
+
+    async def __aiter__(self):
+        for doc in await self.to_list():
+            yield doc
+
+
+class SQLiteCollection:
+    def __init__(self, database: "SQLiteDatabase", name: str):
+        self.database = database
+        self.name = name
+        self.indexed: set[str] = set()
+        self.ttl: dict[str, float] = {}
+        self._ready = False
+        self._purged = 0.0
+
+    def __repr__(self) -> str:
+        return f"SQLiteCollection({self.name!r})"
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        return self.database.client._connect()
+
+    @property
+    def _table(self) -> str:
+        if not self._ready:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {_quote(self.name)} (id TEXT PRIMARY KEY, doc TEXT NOT NULL)"
+            )
+            self._ready = True
+        return _quote(self.name)
+
+    async def _run(self, func, *args):
+        return await self.database.client._run(func, *args)
+
+    # SQL helpers (worker thread only)
+    def _where(self, query: dict) -> tuple[str, list]:
+        clauses, params = [], []
+        for key, cond in query.items():
+            if key == "_id":
+                if _is_scalar(cond):
+                    clauses.append("id = ?")
+                    params.append(_dumps(cond))
+                elif _is_ops(cond) and set(cond) == {"$in"}:
+                    clauses.append(f"id IN ({', '.join('?' * len(cond['$in'])) or 'NULL'})")
+                    params.extend(_dumps(item) for item in cond["$in"])
+            elif key in self.indexed:
+                if _is_scalar(cond):
+                    clauses.append(f"{_json_path(key)} = ?")
+                    params.append(cond)
+                elif _is_ops(cond):
+                    for op, arg in cond.items():
+                        if op in _RANGE_OPS and _is_scalar(arg):
+                            clauses.append(f"{_json_path(key)} {_RANGE_OPS[op]} ?")
+                            params.append(arg)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    @staticmethod
+    def _order(sort: list[tuple[str, int]]) -> str:
+        if not sort:
+            return ""
+        return " ORDER BY " + ", ".join(
+            f"{_json_path(key)} {'DESC' if direction < 0 else 'ASC'}" for key, direction in sort
+        )
+
+    def _select(self, query: dict, sort: list | None = None) -> tuple[str, list]:
+        where, params = self._where(query)
+        return f"SELECT doc FROM {self._table}{where}{self._order(sort or [])}", params
+
+    def _find(self, query: dict, sort: list | None = None, limit: int = 0) -> list[dict]:
+        sql, params = self._select(query, sort)
+        docs = []
+        for (raw,) in self._conn.execute(sql, params):
+            doc = json.loads(raw)
+            if match(doc, query):
+                docs.append(doc)
+                if limit and len(docs) >= limit:
+                    break
+        return docs
+
+    def _first(self, query: dict) -> dict | None:
+        docs = self._find(query, limit=1)
+        return docs[0] if docs else None
+
+    def _insert(self, doc: dict) -> Any:
+        doc.setdefault("_id", uuid4().hex)
+        try:
+            self._conn.execute(
+                f"INSERT INTO {self._table} (id, doc) VALUES (?, ?)",
+                (_dumps(doc["_id"]), _dumps(doc)),
+            )
+        except sqlite3.IntegrityError as e:
+            raise DuplicateKeyError(f"E11000 duplicate key error: {self.name} _id {doc['_id']!r}", 11000) from e
+        return doc["_id"]
+
+    def _save(self, doc: dict) -> None:
+        self._conn.execute(
+            f"UPDATE {self._table} SET doc = ? WHERE id = ?",
+            (_dumps(doc), _dumps(doc["_id"])),
+        )
+
+    def _update(self, query: dict, update: dict, upsert: bool, replace: bool = False) -> UpdateResult:
+        doc = self._first(query)
+        if doc is not None:
+            if replace:
+                changed = {"_id": doc["_id"], **update} != doc
+                doc = {"_id": doc["_id"], **update}
+            else:
+                changed = apply_update(doc, update)
+            if changed:
+                self._save(doc)
+            return UpdateResult(1, int(changed))
+        if not upsert:
+            return UpdateResult()
+
+        doc = _upsert_seed(query)
+        if replace:
+            doc = {**({"_id": doc["_id"]} if "_id" in doc else {}), **deepcopy(update)}
+        else:
+            apply_update(doc, update, inserting=True)
+        return UpdateResult(upserted_id=self._insert(doc))
+
+    def _delete(self, query: dict) -> DeleteResult:
+        doc = self._first(query)
+        if doc is None:
+            return DeleteResult()
+        self._conn.execute(f"DELETE FROM {self._table} WHERE id = ?", (_dumps(doc["_id"]),))
+        return DeleteResult(1)
+
+    def _transaction(self, ops: list, apply, ordered: bool) -> list[dict]:
+        errors = []
+        self._conn.execute("BEGIN")
+        try:
+            for index, op in enumerate(ops):
+                try:
+                    apply(op)
+                except DuplicateKeyError as e:
+                    errors.append({"index": index, "code": 11000, "errmsg": str(e), "op": op})
+                    if ordered:
+                        break
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        return errors
+
+    def _insert_many(self, docs: list[dict], ordered: bool) -> InsertResult:
+        ids = []
+        errors = self._transaction(docs, lambda doc: ids.append(self._insert(doc)), ordered)
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(ids)})
+        return InsertResult(inserted_ids=ids)
+
+    def _bulk_write(self, requests: list, ordered: bool) -> BulkResult:
+        result = BulkResult()
+
+        def apply(op):
+            if isinstance(op, DeleteOne):
+                result.deleted_count += self._delete(op._filter).deleted_count
+                return
+            if not isinstance(op, (UpdateOne, ReplaceOne)):
+                raise NotImplementedError(f"Unsupported bulk operation: {type(op).__name__}")
+            outcome = self._update(op._filter, op._doc, op._upsert, replace=isinstance(op, ReplaceOne))
+            result.matched_count += outcome.matched_count
+            result.modified_count += outcome.modified_count
+            result.upserted_count += outcome.upserted_id is not None
+
+        errors = self._transaction(requests, apply, ordered)
+        if errors:
+            raise BulkWriteError({
+                "writeErrors": errors,
+                "nMatched": result.matched_count,
+                "nModified": result.modified_count,
+                "nUpserted": result.upserted_count,
+                "nRemoved": result.deleted_count,
+            })
+        return result
+
+    def _count(self, query: dict) -> int:
+        if not query:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self._table}").fetchone()[0]
+        return len(self._find(query))
+
+    def _create_index(self, keys, unique: bool = False) -> str:
+        keys = [(keys, 1)] if isinstance(keys, str) else list(keys)
+        name = f"{self.name}_" + "_".join(f"{key}_{direction}" for key, direction in keys)
+        columns = ", ".join(f"{_json_path(key)} {'DESC' if direction < 0 else 'ASC'}" for key, direction in keys)
+        self._conn.execute(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {_quote(name)} ON {self._table} ({columns})"
+        )
+        self.indexed.update(key for key, _ in keys if key != "_id")
+        return name
+
+    def _purge(self) -> int:
+        """Delete documents past a TTL index, like Mongo's TTL monitor does."""
+        if monotonic() - self._purged < _PURGE_INTERVAL:
+            return 0
+        self._purged = monotonic()
+        deleted = 0
+        for key, seconds in self.ttl.items():
+            # Dates are stored as str(datetime), which sorts chronologically in UTC.
+            cutoff = str(datetime.fromtimestamp(time() - seconds, timezone.utc))
+            deleted += self._conn.execute(
+                f"DELETE FROM {self._table} WHERE typeof({_json_path(key)}) = 'text' AND {_json_path(key)} < ?",
+                (cutoff,),
+            ).rowcount
+        return deleted
+
+    def _explain(self, query: dict, sort: list | None = None) -> dict:
+        sql, params = self._select(query, sort)
+        stages = []
+        for row in self._conn.execute(f"EXPLAIN QUERY PLAN {sql}", params):
+            detail = row[-1]
+            if "TEMP B-TREE" in detail:
+                stages.append({"stage": "SORT", "detail": detail})
+            elif "PRIMARY KEY" in detail or "sqlite_autoindex" in detail:
+                stages.append({"stage": "IDHACK", "detail": detail})
+            elif "USING" in detail and "INDEX" in detail:
+                stages.append({"stage": "IXSCAN", "detail": detail})
+            elif detail.startswith("SCAN"):
+                stages.append({"stage": "COLLSCAN", "detail": detail})
+        return {"queryPlanner": {"winningPlan": {"stage": "FETCH", "inputStages": stages}}}
+
+    def _aggregate(self, pipeline: list[dict]) -> list[dict]:
+        docs = self._find({})
+        for stage in pipeline:
+            (op, arg), = stage.items()
+            if op == "$match":
+                docs = [doc for doc in docs if match(doc, arg)]
+            elif op == "$group":
+                groups: dict[str, dict] = {}
+                for doc in docs:
+                    key = _expr(doc, arg["_id"])
+                    group = groups.setdefault(_dumps(key), {"_id": key})
+                    for name, acc in arg.items():
+                        if name == "_id":
+                            continue
+                        (acc_op, acc_expr), = acc.items()
+                        value = _expr(doc, acc_expr)
+                        if acc_op == "$sum":
+                            group[name] = group.get(name, 0) + (value if _is_scalar(value) and not isinstance(value, str) else 0)
+                        elif acc_op in ("$max", "$min"):
+                            if value is not None and (name not in group or _compare(value, group[name], "$gt" if acc_op == "$max" else "$lt")):
+                                group[name] = value
+                        elif acc_op == "$first":
+                            group.setdefault(name, value)
+                        else:
+                            raise NotImplementedError(f"Unsupported accumulator: {acc_op}")
+                docs = list(groups.values())
+            elif op == "$sort":
+                for key, direction in reversed(list(arg.items())):
+                    docs.sort(key=lambda doc: (_expr(doc, f"${key}") is not None, _expr(doc, f"${key}")), reverse=direction < 0)
+            elif op == "$limit":
+                docs = docs[:arg]
+            elif op == "$merge":
+                target = self.database[arg["into"] if isinstance(arg["into"], str) else arg["into"]["coll"]]
+                if arg.get("whenMatched", "merge") != "replace":
+                    raise NotImplementedError("Only $merge with whenMatched: replace is supported")
+                target._transaction(
+                    docs,
+                    lambda doc: target._update({"_id": doc["_id"]}, doc, upsert=True, replace=True),
+                    ordered=True,
+                )
+                docs = []
+            else:
+                raise NotImplementedError(f"Unsupported aggregation stage: {op}")
+        return docs
+
+    # Motor API
+    def find(self, filter: dict | None = None, projection: dict | None = None, **_) -> SQLiteCursor:
+        return SQLiteCursor(self, filter, projection)
+
+    async def find_one(self, filter: dict | None = None, projection: dict | None = None) -> dict | None:
+        doc = await self._run(self._first, filter or {})
+        return _project(doc, projection) if doc is not None else None
+
+    async def insert_one(self, document: dict) -> InsertResult:
+        doc = deepcopy(document)
+        return InsertResult(inserted_id=await self._run(self._insert, doc))
+
+    async def insert_many(self, documents: list[dict], ordered: bool = True) -> InsertResult:
+        return await self._run(self._insert_many, deepcopy(list(documents)), ordered)
+
+    async def update_one(self, filter: dict, update: dict, upsert: bool = False) -> UpdateResult:
+        if self.ttl:
+            await self._run(self._purge)
+        return await self._run(self._update, filter, update, upsert)
+
+    async def replace_one(self, filter: dict, replacement: dict, upsert: bool = False) -> UpdateResult:
+        return await self._run(self._update, filter, replacement, upsert, True)
+
+    async def delete_one(self, filter: dict) -> DeleteResult:
+        return await self._run(self._delete, filter)
+
+    async def bulk_write(self, requests: list, ordered: bool = True) -> BulkResult:
+        return await self._run(self._bulk_write, list(requests), ordered)
+
+    async def count_documents(self, filter: dict) -> int:
+        return await self._run(self._count, filter)
+
+    async def estimated_document_count(self) -> int:
+        return await self._run(self._count, {})
+
+    async def create_index(self, keys, unique: bool = False, expireAfterSeconds: float | None = None, **_) -> str:
+        if expireAfterSeconds is not None:
+            key = keys if isinstance(keys, str) else keys[0][0]
+            self.ttl[key] = expireAfterSeconds
+        return await self._run(self._create_index, keys, unique)
+
+    def aggregate(self, pipeline: list[dict]) -> SQLiteAggregate:
+        return SQLiteAggregate(self, pipeline)
+
+    async def drop(self) -> None:
+        def drop():
+            self._conn.execute(f"DROP TABLE IF EXISTS {_quote(self.name)}")
+            self._ready = False
+            self.indexed.clear()
+        await self._run(drop)
+
+    async def rename(self, new_name: str, dropTarget: bool = False) -> None:
+        target = self.database[new_name]
+
+        def rename():
+            if dropTarget:
+                self._conn.execute(f"DROP TABLE IF EXISTS {_quote(new_name)}")
+            self._conn.execute(f"ALTER TABLE {self._table} RENAME TO {_quote(new_name)}")
+            self._ready = target._ready = False
+            target.indexed, self.indexed = self.indexed, set()
+        await self._run(rename)
+
+
+class SQLiteDatabase:
+    def __init__(self, client: "SQLiteClient", name: str):
+        self.client = client
+        self.name = name
+        self._collections: dict[str, SQLiteCollection] = {}
+
+    def __getitem__(self, name: str) -> SQLiteCollection:
+        if name not in self._collections:
+            self._collections[name] = SQLiteCollection(self, name)
+        return self._collections[name]
+
+    def __getattr__(self, name: str) -> SQLiteCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    async def list_collection_names(self) -> list[str]:
+        rows = await self.client._run(
+            lambda: self.client._connect().execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            ).fetchall()
+        )
+        return [row[0] for row in rows]
+
+    async def command(self, command: str, *_, **__) -> dict:
+        await self.client._run(lambda: self.client._connect().execute("SELECT 1").fetchone())
+        return {"ok": 1}
+
+
+class SQLiteClient:
+    def __init__(self, path: str):
+        """
+        Motor-compatible client for a single SQLite database file.
+
+        The database name used by MongoDB is ignored, the file is the database.
+
+        Args:
+            path (str): Path of the database file, created if missing.
+        """
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self._db = SQLiteDatabase(self, "main")
+        self.admin = self._db
+
+    def __getitem__(self, name: str) -> SQLiteDatabase:
+        return self._db
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        return self._conn
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def close(self) -> None:
+        def close():
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        await self._run(close)
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,109 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+
+import asyncio
+from typing import Any
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from delta import logger
+
+
+class StatsBuffer:
+    def __init__(self, db, interval: int = 5, max_events: int = 200, max_docs: int = 20000):
+        """
+        Write-behind aggregator for play counters.
+
+        Increments are merged in memory per (collection, _id) and flushed as a
+        single unordered bulk_write per collection, every `interval` seconds or
+        as soon as `max_events` increments are pending.
+
+        Args:
+            db: The Motor database the counters live in.
+            interval (int): Seconds between periodic flushes.
+            max_events (int): Pending increments that trigger an early flush.
+            max_docs (int): Upper bound on distinct pending documents. Once it is
+                reached (e.g. Mongo is stalled) new documents are dropped instead
+                of growing memory without limit.
+        """
+        self.db = db
+        self.interval = interval
+        self.max_events = max_events
+        self.max_docs = max_docs
+
+        self.pending: dict[str, dict[Any, dict]] = {}
+        self.size = 0
+        self.events = 0
+        self.dropped = 0
+        self.flushed = 0
+
+        self._lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+
+    def add(self, collection: str, _id: Any, inc: dict, fields: dict | None = None) -> None:
+        """Merge an `$inc` (and optional `$set`) into the pending update for a document."""
+        docs = self.pending.setdefault(collection, {})
+        entry = docs.get(_id)
+        if entry is None:
+            if self.size >= self.max_docs:
+                if not self.dropped:
+                    logger.warning(f"Stats buffer full ({self.max_docs} docs), dropping new counters.")
+                self.dropped += 1
+                return
+            entry = docs[_id] = {"$inc": {}, "$set": {}}
+            self.size += 1
+
+        for key, value in inc.items():
+            entry["$inc"][key] = entry["$inc"].get(key, 0) + value
+        if fields:
+            entry["$set"].update(fields)
+
+        self.events += 1
+        if self.events >= self.max_events:
+            self._wake.set()
+
+    def _requeue(self, collection: str, docs: dict[Any, dict]) -> None:
+        for _id, entry in docs.items():
+            self.add(collection, _id, entry["$inc"], entry["$set"])
+
+    async def flush(self) -> None:
+        """Write every pending update to the database."""
+        async with self._lock:
+            if not self.pending:
+                return
+            pending, self.pending = self.pending, {}
+            self.size = self.events = 0
+
+            for collection, docs in pending.items():
+                ids = list(docs)
+                ops = [
+                    UpdateOne(
+                        {"_id": _id},
+                        {op: fields for op, fields in docs[_id].items() if fields},
+                        upsert=True,
+                    )
+                    for _id in ids
+                ]
+                try:
+                    await self.db[collection].bulk_write(ops, ordered=False)
+                    self.flushed += len(ops)
+                except BulkWriteError as e:
+                    failed = {ids[err["index"]] for err in e.details.get("writeErrors", [])}
+                    logger.warning(f"Stats flush to {collection}: {len(failed)} of {len(ops)} writes failed.")
+                    self._requeue(collection, {_id: docs[_id] for _id in failed})
+                except Exception as e:
+                    logger.warning(f"Stats flush to {collection} failed, retrying later: {type(e).__name__}")
+                    self._requeue(collection, docs)
+
+    async def run(self) -> None:
+        """Flush periodically, or early when enough events are pending."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await asyncio.shield(self.flush())
@@ -1,35 +0,0 @@
-    async def get_daily_play_count(self, days: int = 7) -> list:
-        """Get daily play count for the last N days."""
-        from datetime import datetime, timedelta
-        
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        
-        result = []
-        for i in range(days):
-            current_date = start_date + timedelta(days=i)
-            date_str = current_date.strftime("%Y-%m-%d")
-            
-            # For now, return placeholder data
-            result.append({
-                "date": date_str,
-                "play_count": 0
-            })
-        
-        return result
-
-    async def get_peak_hours(self, days: int = 7) -> list:
-        """Get peak activity hours (0-23)."""
-        # Return hourly play distribution
-        # For now, return zeros as placeholder
-        return [0] * 24
-
-    async def get_platform_stats(self) -> dict:
-        """Get platform distribution statistics."""
-        return {
-            "youtube": 0,
-            "spotify": 0,
-            "soundcloud": 0,
-            "local": 0,
-            "other": 0
-        }
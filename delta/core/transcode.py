@@ -0,0 +1,162 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+
+import asyncio
+import os
+import re
+from pathlib import Path
+
+from delta import config, db, logger, yt
+from delta.core.downloads import Priority
+from delta.helpers import utils
+
+# The format AudioQuality.HIGH is played in: 48 kHz stereo signed 16-bit PCM.
+SAMPLE_RATE = 48000
+CHANNELS = 2
+BYTES_PER_SECOND = SAMPLE_RATE * CHANNELS * 2
+
+VIDEO_ID = re.compile(r"[A-Za-z0-9_-]{11}")
+
+
+class Transcoder:
+    def __init__(self, directory: str, budget: int, top: int, interval: int):
+        """
+        Call-ready raw audio for the most played tracks.
+
+        Every MediaStream makes ntgcalls run an ffmpeg that decodes and
+        resamples the source for as long as the call plays. For the `top`
+        tracks of the global stats this keeps a copy already decoded to
+        48 kHz stereo s16le, which is played as a raw FILE source without any
+        ffmpeg. The copies are rebuilt every `interval` seconds, one at a time
+        and at low CPU priority, and the least recently played go first once
+        `budget` bytes are used.
+
+        Args:
+            directory (str): Where the raw files are kept.
+            budget (int): Bytes the raw files may use, 0 disables the cache.
+            top (int): How many of the most played tracks to keep.
+            interval (int): Seconds between two rebuilds.
+        """
+        self.directory = Path(directory)
+        self.budget = budget
+        self.top = top
+        self.interval = interval
+        self.hits = 0
+        self.misses = 0
+        self.transcoded = 0
+        self.evicted = 0
+        self.failed = 0
+
+    def has(self, track_id: str) -> bool:
+        return bool(self.budget) and (self.directory / f"{track_id}.pcm").exists()
+
+    def path(self, track_id: str) -> str | None:
+        """The raw file of a track if it is cached, marking it as recently played."""
+        if not self.budget:
+            return None
+        path = self.directory / f"{track_id}.pcm"
+        try:
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return str(path)
+
+    async def run(self) -> None:
+        if not self.budget:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.warning(f"Transcode sweep failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def _files(self) -> list[os.DirEntry]:
+        """Cached raw files, least recently played first."""
+        with os.scandir(self.directory) as entries:
+            files = [entry for entry in entries if entry.name.endswith(".pcm")]
+        return sorted(files, key=lambda entry: entry.stat().st_mtime)
+
+    async def sweep(self) -> None:
+        """Transcode the hot tracks that are not cached yet, in rank order."""
+        hot = []
+        for track_id, doc in (await db.get_global_tops(self.top)).items():
+            try:
+                duration = utils.to_seconds(doc["duration"])
+            except (AttributeError, ValueError):
+                continue
+            if VIDEO_ID.fullmatch(track_id) and 0 < duration <= config.DURATION_LIMIT:
+                hot.append((track_id, duration))
+        keep = {track_id for track_id, _ in hot}
+
+        for track_id, duration in hot:
+            target = self.directory / f"{track_id}.pcm"
+            if target.exists():
+                continue
+            if not await asyncio.to_thread(self._make_room, duration * BYTES_PER_SECOND, keep):
+                break
+            source = await yt.download(track_id, priority=Priority.BACKGROUND)
+            if not source:
+                self.failed += 1
+                continue
+            if await self.transcode(source, str(target)):
+                self.transcoded += 1
+            else:
+                self.failed += 1
+
+    def _make_room(self, size: int, keep: set[str]) -> bool:
+        """Evict files outside `keep`, oldest first, until `size` more bytes fit."""
+        files = self._files()
+        used = sum(entry.stat().st_size for entry in files)
+        pinned = sum(entry.stat().st_size for entry in files if entry.name[:-4] in keep)
+        if pinned + size > self.budget:
+            return False
+        for entry in files:
+            if used + size <= self.budget:
+                break
+            if entry.name[:-4] in keep:
+                continue
+            used -= entry.stat().st_size
+            os.remove(entry.path)
+            self.evicted += 1
+        return used + size <= self.budget
+
+    @staticmethod
+    async def transcode(source: str, target: str) -> bool:
+        """Decode `source` into raw 48 kHz stereo s16le at `target`."""
+        temp = f"{target}.part"
+        process = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-nostdin", "-v", "error", "-y",
+            "-i", source,
+            "-vn", "-f", "s16le", "-ac", str(CHANNELS), "-ar", str(SAMPLE_RATE),
+            temp,
+            stderr=asyncio.subprocess.PIPE,
+            preexec_fn=lambda: os.nice(10),
+        )
+        _, stderr = await process.communicate()
+        if process.returncode:
+            logger.warning(f"Transcoding {source} failed: {stderr.decode(errors='ignore')[-200:]}")
+            if os.path.exists(temp):
+                os.remove(temp)
+            return False
+        os.replace(temp, target)
+        return True
+
+    def info(self) -> dict:
+        plays = self.hits + self.misses
+        files = self._files() if self.budget and self.directory.exists() else []
+        return {
+            "files": len(files),
+            "size_mb": round(sum(entry.stat().st_size for entry in files) / 1024 / 1024, 1),
+            "budget_mb": round(self.budget / 1024 / 1024),
+            "hits": self.hits,
+            "hit_rate": round(self.hits / plays, 4) if plays else 0.0,
+            "transcoded": self.transcoded,
+            "evicted": self.evicted,
+            "failed": self.failed,
+        }
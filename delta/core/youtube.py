@@ -5,17 +5,23 @@
 
 import os
 import re
-import yt_dlp
 import random
 import asyncio
 import aiohttp
-from pathlib import Path
+from time import time
+from urllib.parse import parse_qs, urlparse
 
 from py_yt import Playlist, VideosSearch
 
-from delta import logger
+from delta import config, db, logger
+from delta.core.cache import PersistentCache, TTLCache
+from delta.core.downloads import DownloadManager, DownloadScheduler, Priority
+from delta.core.extractor import ExtractorPool, WorkerError
 from delta.helpers import Track, utils
 
+# Words that do not change which video a search resolves to.
+SEARCH_NOISE = {"official", "video", "audio", "lyric", "lyrics", "hd", "hq", "mv", "4k"}
+
 
 class YouTube:
     def __init__(self):
@@ -29,6 +35,38 @@ class YouTube:
             r"(youtube\.com/(watch\?v=|shorts/|playlist\?list=)|youtu\.be/)"
             r"([A-Za-z0-9_-]{11}|PL[A-Za-z0-9_-]+)([&?][^\s]*)?"
         )
+        self.search_cache = PersistentCache(
+            "search",
+            db.search_cachedb,
+            maxsize=2000,
+            ttl=config.SEARCH_CACHE_TTL,
+            negative_ttl=config.SEARCH_NEGATIVE_TTL,
+        )
+        self.video_cache = PersistentCache(
+            "video",
+            db.video_cachedb,
+            maxsize=5000,
+            ttl=config.VIDEO_CACHE_TTL,
+            negative_ttl=config.SEARCH_NEGATIVE_TTL,
+            stale=config.VIDEO_CACHE_STALE,
+        )
+        # Stream URLs in formats expire after a few hours, keep them in memory only.
+        self.formats_cache = TTLCache("formats", maxsize=200, ttl=3 * 60 * 60)
+        self.pool = ExtractorPool(
+            config.YTDLP_WORKERS,
+            timeout=config.YTDLP_TIMEOUT,
+            download_timeout=config.YTDLP_DOWNLOAD_TIMEOUT,
+        )
+        # Never admit more downloads than the pool runs at once, so one let in
+        # (a track about to play above all) does not queue again for a worker.
+        self.scheduler = DownloadScheduler(
+            min(config.DOWNLOAD_CONCURRENCY, self.pool.download_limit)
+            if config.YTDLP_WORKERS
+            else config.DOWNLOAD_CONCURRENCY,
+            config.DOWNLOAD_CHAT_CONCURRENCY,
+        )
+        self.downloads = DownloadManager(self.scheduler, failure_ttl=config.DOWNLOAD_RETRY_AFTER)
+        self._fills: set[asyncio.Task] = set()
 
     def get_cookies(self):
         if not self.checked:
@@ -71,43 +109,46 @@ class YouTube:
         return None
 
     async def get_video_info(self, video_id: str, m_id: int, video: bool = False, user_id: int = 0) -> Track | None:
-        """Get video info directly using yt_dlp."""
-        url = self.base + video_id
+        """Get video info, from the metadata cache when possible."""
         try:
-            def _get_info():
-                opts = {"quiet": True, "no_warnings": True}
-                cookie = self.get_cookies()
-                if cookie:
-                    opts["cookiefile"] = cookie
-                with yt_dlp.YoutubeDL(opts) as ydl:
-                    info = ydl.extract_info(url, download=False)
-                    return info
-            
-            info = await asyncio.to_thread(_get_info)
-            if not info:
-                return None
-            
-            duration_sec = info.get("duration", 0)
-            minutes = duration_sec // 60
-            seconds = duration_sec % 60
-            duration = f"{minutes}:{seconds:02d}"
-            
-            return Track(
-                id=info.get("id"),
-                channel_name=info.get("channel", info.get("uploader", "")),
-                duration=duration,
-                duration_sec=duration_sec,
-                message_id=m_id,
-                title=info.get("title"),
-                thumbnail=info.get("thumbnail", ""),
-                url=info.get("webpage_url", url),
-                view_count=str(info.get("view_count", "")),
-                video=video,
-                user_id=user_id,
-            )
+            meta = await self.video_cache.get_or_load(video_id, lambda: self._video_meta(video_id))
         except Exception as e:
             logger.error(f"Failed to get video info: {e}")
             return None
+        if not meta:
+            return None
+        return Track(**meta, message_id=m_id, video=video, user_id=user_id)
+
+    async def _extract(self, video_id: str) -> dict:
+        """Run yt-dlp once per video for both the metadata and the formats."""
+        return await self.formats_cache.get_or_load(video_id, lambda: self._extract_info(video_id))
+
+    async def _extract_info(self, video_id: str) -> dict:
+        url = self.base + video_id
+        opts = {"quiet": True, "no_warnings": True}
+        cookie = self.get_cookies()
+        if cookie:
+            opts["cookiefile"] = cookie
+
+        info = await self.pool.run("extract", url, opts)
+        if not info:
+            return {"meta": None, "formats": [], "url": url}
+
+        duration_sec = info.get("duration") or 0
+        meta = {
+            "id": info.get("id"),
+            "channel_name": info.get("channel", info.get("uploader", "")),
+            "duration": f"{duration_sec // 60}:{duration_sec % 60:02d}",
+            "duration_sec": duration_sec,
+            "title": info.get("title"),
+            "thumbnail": info.get("thumbnail", ""),
+            "url": info.get("webpage_url", url),
+            "view_count": str(info.get("view_count", "")),
+        }
+        return {"meta": meta, "formats": info.get("formats", []), "url": url}
+
+    async def _video_meta(self, video_id: str) -> dict | None:
+        return (await self._extract(video_id))["meta"]
 
     async def search(self, query: str, m_id: int, video: bool = False, user_id: int = 0) -> Track | None:
         # Check if query is a URL - extract video ID and get info directly
@@ -116,29 +157,40 @@ class YouTube:
             if video_id:
                 return await self.get_video_info(video_id, m_id, video, user_id)
         
-        # Regular search
         try:
-            _search = VideosSearch(query, limit=1, with_live=False)
-            results = await _search.next()
-        except:
-             return None
-             
-        if results and results["result"]:
-            data = results["result"][0]
-            return Track(
-                id=data.get("id"),
-                channel_name=data.get("channel", {}).get("name"),
-                duration=data.get("duration"),
-                duration_sec=utils.to_seconds(data.get("duration")),
-                message_id=m_id,
-                title=data.get("title"),
-                thumbnail=data.get("thumbnails", [{}])[-1].get("url").split("?")[0],
-                url=data.get("link"),
-                view_count=data.get("viewCount", {}).get("short"),
-                video=video,
-                user_id=user_id,
+            meta = await self.search_cache.get_or_load(
+                self.normalize_query(query), lambda: self._search(query)
             )
-        return None
+        except Exception:
+            return None
+        if not meta:
+            return None
+        return Track(**meta, message_id=m_id, video=video, user_id=user_id)
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Cache key of a search query: lowercase words without punctuation or noise."""
+        words = re.findall(r"\w+", query.lower())
+        return " ".join(word for word in words if word not in SEARCH_NOISE) or " ".join(words)
+
+    async def _search(self, query: str) -> dict | None:
+        """Resolve a query to the metadata of its first result, None if there is none."""
+        _search = VideosSearch(query, limit=1, with_live=False)
+        results = await _search.next()
+        if not results or not results["result"]:
+            return None
+
+        data = results["result"][0]
+        return {
+            "id": data.get("id"),
+            "channel_name": data.get("channel", {}).get("name"),
+            "duration": data.get("duration"),
+            "duration_sec": utils.to_seconds(data.get("duration")),
+            "title": data.get("title"),
+            "thumbnail": data.get("thumbnails", [{}])[-1].get("url").split("?")[0],
+            "url": data.get("link"),
+            "view_count": data.get("viewCount", {}).get("short"),
+        }
 
     async def playlist(self, limit: int, user: str, url: str, video: bool) -> list[Track | None]:
         tracks = []
@@ -165,29 +217,117 @@ class YouTube:
 
     async def formats(self, video_id: str, lyrics: bool = False):
         """Get available formats for a YouTube video."""
-        url = self.base + video_id
         try:
-            def _get_formats():
-                with yt_dlp.YoutubeDL({"quiet": True}) as ydl:
-                    info = ydl.extract_info(url, download=False)
-                    return info.get("formats", []), url
-            
-            return await asyncio.to_thread(_get_formats)
+            data = await self._extract(video_id)
         except Exception as e:
             logger.error(f"Failed to get formats: {e}")
-            return [], url
+            return [], self.base + video_id
 
-    async def download(self, video_id: str, video: bool = False) -> str | None:
-        url = self.base + video_id
-        ext = "mp4" if video else "webm"
-        filename = f"downloads/{video_id}.{ext}"
+        if data["meta"] and video_id not in self.video_cache.memory:
+            await self.video_cache.put(video_id, data["meta"])
+        return data["formats"], data["url"]
+
+    @staticmethod
+    def _expires(fmt: dict) -> float:
+        """Unix time a direct googlevideo URL stops working, infinity if unknown."""
+        expire = parse_qs(urlparse(fmt.get("url", "")).query).get("expire")
+        return float(expire[0]) if expire else float("inf")
+
+    @staticmethod
+    def _pick(formats: list[dict], video: bool, height: int) -> dict | None:
+        """Best single-stream format reachable over plain HTTP(S)."""
+        candidates = []
+        for fmt in formats:
+            if fmt.get("protocol") not in ("http", "https") or not fmt.get("url"):
+                continue
+            has_video = fmt.get("vcodec") not in (None, "none")
+            has_audio = fmt.get("acodec") not in (None, "none")
+            if video and has_video and not has_audio and (fmt.get("height") or 0) <= height:
+                candidates.append(((fmt.get("height") or 0, fmt.get("ext") == "mp4", fmt.get("tbr") or 0), fmt))
+            elif not video and has_audio and not has_video:
+                candidates.append(((fmt.get("acodec") == "opus", fmt.get("abr") or 0), fmt))
+        return max(candidates, key=lambda c: c[0])[1] if candidates else None
+
+    async def stream_urls(
+        self, video_id: str, video: bool = False, quality: str = "720p", duration: int = 0
+    ) -> tuple[str, str | None, dict] | None:
+        """
+        Direct media URLs of a video: (media URL, separate audio URL or None, HTTP headers).
+
+        The URLs come from the cached formats. If they expire before `duration`
+        seconds of playback (plus a minute) the formats are extracted again.
+        """
+        for _ in range(2):
+            data = await self._extract(video_id)
+            audio = self._pick(data["formats"], False, 0)
+            picked = [self._pick(data["formats"], True, int(quality.rstrip("p"))), audio] if video else [audio]
+            if not all(picked):
+                return None
+            if all(self._expires(fmt) > time() + duration + 60 for fmt in picked):
+                return (
+                    picked[0]["url"],
+                    picked[1]["url"] if video else None,
+                    picked[0].get("http_headers") or {},
+                )
+            self.formats_cache.pop(video_id)
+        return None
 
-        if Path(filename).exists():
-            return filename
+    async def progressive(self, track: Track, chat_id: int) -> bool:
+        """
+        Point a track at its direct stream URL and fill the file in the background.
 
+        Returns False if no usable URL was found, the caller then downloads
+        the file as usual.
+        """
+        try:
+            urls = await self.stream_urls(track.id, track.video, duration=track.duration_sec or 0)
+        except Exception as e:
+            logger.warning(f"Failed to resolve stream of {track.id}: {e}")
+            return False
+        if not urls:
+            return False
+
+        track.stream_url, track.stream_audio_url, track.stream_headers = urls
+        self.fill(track, chat_id)
+        return True
+
+    def fill(self, track: Track, chat_id: int) -> None:
+        """Download a track that already plays from elsewhere, for replays, loops and seeks."""
+        task = asyncio.create_task(self._fill(track, chat_id))
+        self._fills.add(task)
+        task.add_done_callback(self._fills.discard)
+
+    async def _fill(self, track: Track, chat_id: int) -> None:
+        path = await self.download(track.id, video=track.video, priority=Priority.PREFETCH, chat_id=chat_id)
+        if path and not track.file_path:
+            track.file_path = path
+
+    async def download(
+        self,
+        video_id: str,
+        video: bool = False,
+        quality: str = "720p",
+        priority: Priority = Priority.NOW_PLAYING,
+        chat_id: int | None = None,
+    ) -> str | None:
+        """Download a video (or its audio) once, however many callers ask for it."""
+        ext = "mp4" if video else "webm"
+        suffix = "" if not video or quality == "720p" else f"_{quality}"
+        filename = f"downloads/{video_id}{suffix}.{ext}"
+        key = (video_id, video, quality if video else None)
+        return await self.downloads.get(
+            key,
+            filename,
+            lambda temp: self._download(video_id, video, quality, temp),
+            priority=priority,
+            chat_id=chat_id,
+        )
+
+    async def _download(self, video_id: str, video: bool, quality: str, temp: str) -> bool:
+        url = self.base + video_id
         cookie = self.get_cookies()
         base_opts = {
-            "outtmpl": "downloads/%(id)s.%(ext)s",
+            "outtmpl": os.path.splitext(temp)[0] + ".%(ext)s",
             "quiet": True,
             "noplaylist": True,
             "geo_bypass": True,
@@ -198,9 +338,11 @@ class YouTube:
         }
 
         if video:
+            height = int(quality.rstrip("p"))
+            width = (height * 16 + 8) // 9
             ydl_opts = {
                 **base_opts,
-                "format": "(bestvideo[height<=?720][width<=?1280][ext=mp4])+(bestaudio)",
+                "format": f"(bestvideo[height<=?{height}][width<=?{width}][ext=mp4])+(bestaudio)",
                 "merge_output_format": "mp4",
             }
         else:
@@ -209,16 +351,15 @@ class YouTube:
                 "format": "bestaudio[ext=webm][acodec=opus]",
             }
 
-        def _download():
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                try:
-                    ydl.download([url])
-                except (yt_dlp.utils.DownloadError, yt_dlp.utils.ExtractorError):
-                    if cookie: self.cookies.remove(cookie)
-                    return None
-                except Exception as ex:
-                    logger.warning("Download failed: %s", ex)
-                    return None
-            return filename
-
-        return await asyncio.to_thread(_download)
+        try:
+            await self.pool.run("download", url, ydl_opts)
+        except WorkerError as ex:
+            if ex.kind in ("DownloadError", "ExtractorError"):
+                if cookie in self.cookies:
+                    self.cookies.remove(cookie)
+            else:
+                logger.warning("Download failed: %s", ex)
+            return False
+        except asyncio.TimeoutError:
+            return False
+        return True
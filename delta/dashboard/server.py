@@ -142,7 +142,7 @@ async def get_overview():
         users = await db.get_users()
         chats = await db.get_chats()
         total_plays = await db.get_queries()
-        active_calls = await db.active_callsdb.count_documents({})
+        active_calls = len(db.active_calls)
 
         return StatsOverview(
             total_users=len(users),
@@ -251,7 +251,7 @@ async def get_top_chats(limit: int = 10):
 
 @dashboard_app.get("/api/daily-stats")
 async def get_daily_stats(days: int = 7):
-    """Get daily statistics for the last N days"""
+    """Get daily statistics for the last N days (up to a year)"""
     try:
         # Get daily play counts from database
         result = await db.get_daily_play_count(days=days)
@@ -263,7 +263,7 @@ async def get_daily_stats(days: int = 7):
 
 @dashboard_app.get("/api/peak-hours")
 async def get_peak_hours(days: int = 7):
-    """Get peak activity hours"""
+    """Get peak activity hours over the last N days (up to a year)"""
     try:
         data = await db.get_peak_hours(days=days)
         return {"data": data}
@@ -283,26 +283,32 @@ async def get_platform_distribution():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@dashboard_app.get("/api/caches")
+async def get_caches():
+    """Get counters of the in-memory caches and the persistent lookup caches"""
+    from delta.core.cache import PersistentCache, TTLCache
+
+    return {"data": TTLCache.report(), "persistent": PersistentCache.report()}
+
+
 @dashboard_app.get("/api/active-calls")
 async def get_active_calls():
     """Get currently active voice calls"""
     try:
         active = []
-        active_chats = await db.get_active_calls()
-        for chat_id in active_chats:
+        for call in db.active_calls.values():
+            chat_id = call.chat_id
             try:
                 chat = await telegram_app.get_chat(chat_id)
-                active.append({
-                    "chat_id": chat_id,
-                    "chat_name": chat.title or f"Chat {chat_id}",
-                    "is_playing": await db.playing(chat_id)
-                })
+                chat_name = chat.title or f"Chat {chat_id}"
             except:
-                active.append({
-                    "chat_id": chat_id,
-                    "chat_name": f"Chat {chat_id}",
-                    "is_playing": await db.playing(chat_id)
-                })
+                chat_name = f"Chat {chat_id}"
+            active.append({
+                "chat_id": chat_id,
+                "chat_name": chat_name,
+                "is_playing": call.playing,
+                "assistant": call.assistant
+            })
         
         return active
     except Exception as e:
@@ -409,7 +415,7 @@ async def broadcast_stats():
             users_count = len(await db.get_users())
             chats_count = len(await db.get_chats())
             plays_count = await db.get_queries()
-            active_calls = await db.active_callsdb.count_documents({})
+            active_calls = len(db.active_calls)
             
             # System Stats
             sys_stats = None
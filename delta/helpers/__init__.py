@@ -18,6 +18,7 @@ from delta.helpers._thumbnails import Thumbnail, thumb
 from delta.helpers._utilities import Utilities
 from delta.helpers._filters import BANNED_USERS
 from delta.helpers._filters import not_blacklisted
+from delta.helpers._filters import sudo_users_filter
 
 # Create singleton instances
 buttons = Inline()
@@ -5,7 +5,7 @@
 
 from functools import wraps
 
-from pyrogram import StopPropagation, enums, types
+from pyrogram import enums, types
 
 # Note: 'app' and 'db' are imported lazily in functions to avoid circular imports
 
@@ -27,14 +27,13 @@ def admin_check(func):
             else update.message.chat.id
         )
         user_id = update.from_user.id
-        admins = await db.get_admins(chat_id)
 
         # Owner and sudoers bypass admin check
         from delta import config
         if user_id in app.sudoers or user_id == config.OWNER_ID:
             return await func(_, update, *args, **kwargs)
 
-        if user_id not in admins:
+        if user_id not in await db.get_admins(chat_id):
             return await reply("Anda? Kelola obrolan video? Tidak dengan izin seperti itu.")
 
         return await func(_, update, *args, **kwargs)
@@ -75,22 +74,13 @@ def can_manage_vc(func):
 
 
 async def is_admin(chat_id: int, user_id: int) -> bool:
-    from delta import app, config, db
+    from delta import config, db
     
     # Owner always has admin rights
     if user_id == config.OWNER_ID:
         return True
     
-    if user_id in await db.get_admins(chat_id):
-        return True
-    try:
-        member = await app.get_chat_member(chat_id, user_id)
-        return member.status in [
-            enums.ChatMemberStatus.ADMINISTRATOR,
-            enums.ChatMemberStatus.OWNER,
-        ]
-    except:
-        raise StopPropagation
+    return user_id in await db.get_admins(chat_id)
 
 
 async def reload_admins(chat_id: int) -> list[int]:
@@ -37,3 +37,6 @@ class Track:
     user_id: int = 0
     view_count: str = None
     video: bool = False
+    stream_url: str = None
+    stream_audio_url: str = None
+    stream_headers: dict = None
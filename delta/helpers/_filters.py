@@ -18,3 +18,13 @@ def _is_banned(_, client, message):
     return message.from_user.id in getattr(client, "bl_users", set())
 
 BANNED_USERS = filters.create(_is_banned)
+
+
+def _is_sudo(_, client, message):
+    from delta import config
+
+    if not message.from_user:
+        return False
+    return message.from_user.id in getattr(client, "sudoers", set()) or message.from_user.id == config.OWNER_ID
+
+sudo_users_filter = filters.create(_is_sudo)
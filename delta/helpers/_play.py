@@ -11,6 +11,74 @@ from delta import app, config, db, logger, queue, yt
 from delta.helpers import utils
 
 
+async def join_assistant(m: types.Message) -> types.Message | None:
+    """
+    Make sure the chat's assistant is a member before it joins the call.
+
+    Returns the reply sent when the assistant could not join, else None.
+    """
+    chat_id = m.chat.id
+    if not await db.get_call(chat_id):
+        client = await db.get_client(chat_id)
+        try:
+            member = await app.get_chat_member(chat_id, client.id)
+            if member.status in [
+                enums.ChatMemberStatus.BANNED,
+                enums.ChatMemberStatus.RESTRICTED,
+            ]:
+                try:
+                    await app.unban_chat_member(
+                        chat_id=chat_id, user_id=client.id
+                    )
+                except:
+                    return await m.reply_text(
+                        f"<u><b>Asisten {app.name} dibanned dari chat Anda</b></u>\n\n<b>ID:</b> <code>{client.id}</code>\n<b>Nama:</b> {client.mention}\n<b>Username:</b> @{client.username if client.username else 'None'}"
+                    )
+        except errors.ChatAdminRequired:
+            return await m.reply_text("Bot memerlukan izin <b>undang pengguna via link</b> untuk bekerja.")
+        except (errors.UserNotParticipant, errors.exceptions.bad_request_400.UserNotParticipant):
+            if m.chat.username:
+                invite_link = m.chat.username
+                try:
+                    await client.resolve_peer(invite_link)
+                except:
+                    pass
+            else:
+                try:
+                    invite_link = (await app.get_chat(chat_id)).invite_link
+                    if not invite_link:
+                        invite_link = await app.export_chat_invite_link(chat_id)
+                except errors.ChatAdminRequired:
+                    return await m.reply_text("Bot memerlukan izin <b>undang pengguna via link</b> untuk bekerja.")
+                except Exception as ex:
+                    return await m.reply_text(
+                        f"Gagal mengundang asisten ke chat.\n\nAlasan: <code>{type(ex).__name__}</code>"
+                    )
+
+            umm = await m.reply_text(f"Tunggu sebentar...\n\nMengundang asisten {app.name} ke chat Anda.")
+            await asyncio.sleep(2)
+            try:
+                await client.join_chat(invite_link)
+            except errors.UserAlreadyParticipant:
+                pass
+            except errors.InviteRequestSent:
+                try:
+                    await client.approve_chat_join_request(chat_id, client.id)
+                except Exception as ex:
+                    return await umm.edit_text(
+                        f"Gagal mengundang asisten ke chat.\n\nAlasan: <code>{type(ex).__name__}</code>"
+                    )
+            except Exception as ex:
+                logger.error(f"Error joining chat - {chat_id}: {ex}")
+                return await umm.edit_text(
+                    f"Gagal mengundang asisten ke chat.\n\nAlasan: <code>{type(ex).__name__}</code>"
+                )
+
+            await umm.delete()
+            await client.resolve_peer(chat_id)
+
+
+
 def checkUB(play):
     async def wrapper(_, m: types.Message):
         if not m.from_user:
@@ -47,64 +115,8 @@ def checkUB(play):
                     "<u><b>Hanya admin yang bisa play</b></u>\n\nHanya admin yang diizinkan memutar musik di chat ini."
                 )
 
-        if not await db.get_call(chat_id):
-            client = await db.get_client(chat_id)
-            try:
-                member = await app.get_chat_member(chat_id, client.id)
-                if member.status in [
-                    enums.ChatMemberStatus.BANNED,
-                    enums.ChatMemberStatus.RESTRICTED,
-                ]:
-                    try:
-                        await app.unban_chat_member(
-                            chat_id=chat_id, user_id=client.id
-                        )
-                    except:
-                        return await m.reply_text(
-                            f"<u><b>Asisten {app.name} dibanned dari chat Anda</b></u>\n\n<b>ID:</b> <code>{client.id}</code>\n<b>Nama:</b> {client.mention}\n<b>Username:</b> @{client.username if client.username else 'None'}"
-                        )
-            except errors.ChatAdminRequired:
-                return await m.reply_text("Bot memerlukan izin <b>undang pengguna via link</b> untuk bekerja.")
-            except (errors.UserNotParticipant, errors.exceptions.bad_request_400.UserNotParticipant):
-                if m.chat.username:
-                    invite_link = m.chat.username
-                    try:
-                        await client.resolve_peer(invite_link)
-                    except:
-                        pass
-                else:
-                    try:
-                        invite_link = (await app.get_chat(chat_id)).invite_link
-                        if not invite_link:
-                            invite_link = await app.export_chat_invite_link(chat_id)
-                    except errors.ChatAdminRequired:
-                        return await m.reply_text("Bot memerlukan izin <b>undang pengguna via link</b> untuk bekerja.")
-                    except Exception as ex:
-                        return await m.reply_text(
-                            f"Gagal mengundang asisten ke chat.\n\nAlasan: <code>{type(ex).__name__}</code>"
-                        )
-
-                umm = await m.reply_text(f"Tunggu sebentar...\n\nMengundang asisten {app.name} ke chat Anda.")
-                await asyncio.sleep(2)
-                try:
-                    await client.join_chat(invite_link)
-                except errors.UserAlreadyParticipant:
-                    pass
-                except errors.InviteRequestSent:
-                    try:
-                        await client.approve_chat_join_request(chat_id, client.id)
-                    except Exception as ex:
-                        return await umm.edit_text(
-                            f"Gagal mengundang asisten ke chat.\n\nAlasan: <code>{type(ex).__name__}</code>"
-                        )
-                except Exception as ex:
-                    logger.error(f"Error joining chat - {chat_id}: {ex}")
-                    return await umm.edit_text(
-                        f"Gagal mengundang asisten ke chat.\n\nAlasan: <code>{type(ex).__name__}</code>"
-                    )
-
-                await umm.delete()
-                await client.resolve_peer(chat_id)
+        if await join_assistant(m):
+            return
 
         if await db.get_cmd_delete(chat_id):
             try:
@@ -4,7 +4,7 @@
 
 
 from collections import defaultdict, deque
-from typing import Union
+from typing import Callable, Union
 
 from ._dataclass import Media, Track
 
@@ -14,10 +14,20 @@ MediaItem = Union[Media, Track]
 class Queue:
     def __init__(self):
         self.queues: dict[int, deque[MediaItem]] = defaultdict(deque)
+        self.listeners: list[Callable[[int], None]] = []
+
+    def subscribe(self, listener: Callable[[int], None]) -> None:
+        """Call `listener(chat_id)` whenever the queue of a chat changes."""
+        self.listeners.append(listener)
+
+    def _changed(self, chat_id: int) -> None:
+        for listener in self.listeners:
+            listener(chat_id)
 
     def add(self, chat_id: int, item: MediaItem) -> int:
         """Add an item to the queue and return its position (1-based)."""
         self.queues[chat_id].append(item)
+        self._changed(chat_id)
         return len(self.queues[chat_id]) - 1
 
     def check_item(self, chat_id: int, item_id: str) -> tuple[int, MediaItem | None]:
@@ -42,6 +52,7 @@ class Queue:
             self.queues[chat_id].rotate(-remove)
             self.queues[chat_id].popleft()
             self.queues[chat_id].rotate(remove)
+        self._changed(chat_id)
 
     def get_current(self, chat_id: int) -> MediaItem | None:
         """Return the currently playing item (first in queue), if any."""
@@ -55,6 +66,7 @@ class Queue:
             return self.queues[chat_id][1] if len(self.queues[chat_id]) > 1 else None
 
         self.queues[chat_id].popleft()
+        self._changed(chat_id)
         return self.queues[chat_id][0] if self.queues[chat_id] else None
 
     def get_queue(self, chat_id: int) -> list[MediaItem]:
@@ -65,6 +77,7 @@ class Queue:
         """Remove the currently playing item only (if exists)."""
         if self.queues[chat_id]:
             self.queues[chat_id].popleft()
+            self._changed(chat_id)
 
     def shuffle(self, chat_id: int) -> bool:
         """Shuffle the queue (except currently playing item). Returns True if successful."""
@@ -81,8 +94,10 @@ class Queue:
         
         # Rebuild queue with current item first
         self.queues[chat_id] = deque([current] + remaining)
+        self._changed(chat_id)
         return True
 
     def clear(self, chat_id: int) -> None:
         """Clear the entire queue."""
         self.queues[chat_id].clear()
+        self._changed(chat_id)
@@ -0,0 +1,107 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+"""
+Database maintenance commands - one-shot backfills and query plan audit
+"""
+
+import html
+from time import time
+
+from pyrogram import enums, filters, types
+
+from delta import app, config, db, logger
+from delta.helpers import sudo_users_filter
+
+
+async def _schema() -> str:
+    if not db.stats_migration_pending:
+        return "already migrated"
+    return f"{await db.migrate_stats_schema()} documents migrated"
+
+
+async def _leaderboards() -> str:
+    users, chats = await db.backfill_leaderboards()
+    return f"{users} users, {chats} chats"
+
+
+async def _platforms() -> str:
+    counts = await db.backfill_platform_stats()
+    return ", ".join(f"{name} {count}" for name, count in counts.items())
+
+
+BACKFILLS = {
+    "schema": _schema,
+    "leaderboards": _leaderboards,
+    "platforms": _platforms,
+}
+
+
+@app.on_message(filters.command(["backfill"]) & filters.user(config.OWNER_ID))
+async def backfill_handler(_, message: types.Message):
+    """
+    Rebuild derived stats collections from existing data (Owner only)
+
+    Usage: /backfill [schema|leaderboards|platforms]
+    """
+    names = message.command[1:] or list(BACKFILLS)
+    unknown = [name for name in names if name not in BACKFILLS]
+    if unknown:
+        return await message.reply_text(
+            f"❌ <b>Unknown backfill:</b> <code>{', '.join(unknown)}</code>\n\n"
+            f"<blockquote>Available: <code>{', '.join(BACKFILLS)}</code></blockquote>",
+            parse_mode=enums.ParseMode.HTML
+        )
+
+    sent = await message.reply_text(
+        "⏳ <b>Running backfill...</b>",
+        parse_mode=enums.ParseMode.HTML
+    )
+    lines = []
+    for name in names:
+        start = time()
+        try:
+            result = await BACKFILLS[name]()
+            lines.append(f"✅ <b>{name}:</b> {result} ({time() - start:.1f}s)")
+            logger.info(f"Backfill {name} completed: {result}")
+        except Exception as e:
+            lines.append(f"❌ <b>{name}:</b> {type(e).__name__}: {e}")
+            logger.error(f"Backfill {name} failed: {e}", exc_info=True)
+
+    await sent.edit_text(
+        "🛠 <b>Backfill</b>\n\n<blockquote>" + "\n".join(lines) + "</blockquote>",
+        parse_mode=enums.ParseMode.HTML
+    )
+
+
+@app.on_message(filters.command(["dbaudit"]) & sudo_users_filter)
+async def dbaudit_handler(_, message: types.Message):
+    """
+    Explain the hot database queries and flag collection scans (Admin only)
+
+    Usage: /dbaudit
+    """
+    sent = await message.reply_text(
+        "🔎 <b>Auditing query plans...</b>",
+        parse_mode=enums.ParseMode.HTML
+    )
+    report = await db.audit_queries()
+
+    lines = []
+    for query in report:
+        if query.get("error"):
+            icon = "⚠️"
+            detail = html.escape(query["error"][:80])
+        else:
+            icon = "❌" if query["collscan"] else "✅"
+            detail = ", ".join(query["stages"])
+        lines.append(f"{icon} <b>{query['name']}</b> ({query['collection']}): <code>{detail}</code>")
+
+    scans = sum(1 for query in report if query["collscan"])
+    await sent.edit_text(
+        f"🗄 <b>Query Plan Audit</b>\n\n"
+        f"<blockquote expandable>" + "\n".join(lines) + "</blockquote>\n\n"
+        f"<b>COLLSCAN:</b> {scans} of {len(report)} queries",
+        parse_mode=enums.ParseMode.HTML
+    )
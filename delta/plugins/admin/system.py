@@ -13,19 +13,10 @@ from datetime import datetime
 from pyrogram import enums, filters, types
 
 from delta import app, config, logger
+from delta.helpers import sudo_users_filter
 from delta.helpers._graceful import graceful_handler, safe_restart, with_flood_wait_handler
 
 
-# Custom sudo filter that checks at runtime
-def sudo_filter(_, __, message):
-    """Runtime check for sudo users"""
-    if not message.from_user:
-        return False
-    return message.from_user.id in app.sudoers or message.from_user.id == config.OWNER_ID
-
-sudo_users_filter = filters.create(sudo_filter)
-
-
 @app.on_message(filters.command(["restart", "reboot"]) & sudo_users_filter)
 async def restart_handler(_, message: types.Message):
     """
@@ -90,7 +81,8 @@ async def status_handler(_, message: types.Message):
     
     Usage: /status
     """
-    from delta import boot, db, anon
+    from delta import boot, db, anon, prefetch, radio, transcoder, yt
+    from delta.core.cache import PersistentCache, TTLCache
     from delta.helpers._graceful import flood_handler
     import psutil
     import platform
@@ -108,7 +100,27 @@ async def status_handler(_, message: types.Message):
     # Get bot stats
     total_chats = len(await db.get_chats())
     total_users = len(await db.get_users())
-    active_calls = await db.active_callsdb.count_documents({})
+    active_calls = len(db.active_calls)
+    caches = "\n".join(
+        f"• {cache['name']}: {cache['size']}/{cache['maxsize']}, "
+        f"{cache['hit_rate'] * 100:.1f}% hit, {cache['evictions']} evicted"
+        for cache in TTLCache.report()
+    )
+    lookups = "\n".join(
+        f"• {cache['name']}: {cache['hit_rate'] * 100:.1f}% hit, "
+        f"{cache['saved_seconds']}s saved (avg {cache['avg_load_ms']} ms)"
+        for cache in PersistentCache.report()
+    )
+    pool, downloads, scheduler = yt.pool.info(), yt.downloads.info(), yt.scheduler.info()
+    prefetched = prefetch.info()
+    raw = transcoder.info()
+    stations = radio.info()
+    ttfa = ", ".join(
+        f"{mode} {info['p50_ms']} ms" for mode, info in anon.ttfa_info().items() if info["count"]
+    ) or "no data"
+    queued = ", ".join(
+        f"{name.lower()} {count}" for name, count in scheduler["queued"].items() if count
+    ) or "empty"
     
     status_text = (
         f"🤖 <b>Bot Status</b>\n\n"
@@ -124,6 +136,23 @@ async def status_handler(_, message: types.Message):
         f"• Groups: {total_chats}\n"
         f"• Users: {total_users}\n"
         f"• Active Calls: {active_calls}\n\n"
+        f"<b>🗃 Caches:</b>\n"
+        f"{caches}\n\n"
+        f"<b>🔎 Lookups:</b>\n"
+        f"{lookups}\n\n"
+        f"<b>⬇️ Downloads:</b>\n"
+        f"• yt-dlp workers: {pool['busy']}/{pool['workers']} busy, {pool['restarts']} restarts\n"
+        f"• Files: {downloads['downloads']} fetched, {downloads['hits']} reused, "
+        f"{downloads['coalesced']} coalesced, {downloads['failed']} failed\n"
+        f"• Running: {scheduler['active']}/{scheduler['limit']}, queue: {queued}\n"
+        f"• Wait (now playing): {scheduler['avg_wait_ms']['NOW_PLAYING']} ms\n"
+        f"• Prefetch: {prefetched['hit_rate'] * 100:.1f}% hit, {prefetched['prefetched']} ready, "
+        f"gap avg {prefetched['gap_avg_ms']} ms / p95 {prefetched['gap_p95_ms']} ms\n"
+        f"• Time to first audio (p50): {ttfa}\n"
+        f"• Raw audio: {raw['files']} tracks, {raw['size_mb']}/{raw['budget_mb']} MB, "
+        f"{raw['hit_rate'] * 100:.1f}% of plays\n"
+        f"• Radio: {len(stations)} stations, {sum(s['listeners'] for s in stations)} listening chats, "
+        f"{sum(s['dropped'] for s in stations)} frames dropped\n\n"
         f"<b>⚡ FloodWait:</b>\n"
         f"• Count: {flood_handler.flood_wait_count}\n"
         f"• Shutdown: {'🛑 Yes' if graceful_handler.is_shutting_down else '✅ No'}"
@@ -37,9 +37,6 @@ async def load_custom_messages():
 
 
 # Auto Clear PM Handler
-@userbot.one.on_message(filters.private & filters.incoming, group=1)
-@userbot.two.on_message(filters.private & filters.incoming, group=1)
-@userbot.three.on_message(filters.private & filters.incoming, group=1)
 async def pm_auto_clear(client, message: Message):
     """Auto clear PM messages after 3 seconds without blocking."""
     
@@ -88,9 +85,6 @@ async def pm_auto_clear(client, message: Message):
 
 
 # Approve command (for owner only)
-@userbot.one.on_message(filters.command("approve", prefixes=".") & filters.me)
-@userbot.two.on_message(filters.command("approve", prefixes=".") & filters.me)
-@userbot.three.on_message(filters.command("approve", prefixes=".") & filters.me)
 async def approve_pm(client, message: Message):
     """Approve a user to PM (disable auto clear for them)."""
     if message.reply_to_message:
@@ -108,9 +102,6 @@ async def approve_pm(client, message: Message):
 
 
 # Disapprove command (for owner only)
-@userbot.one.on_message(filters.command("disapprove", prefixes=".") & filters.me)
-@userbot.two.on_message(filters.command("disapprove", prefixes=".") & filters.me)
-@userbot.three.on_message(filters.command("disapprove", prefixes=".") & filters.me)
 async def disapprove_pm(client, message: Message):
     """Disapprove a user (enable auto clear)."""
     if message.reply_to_message:
@@ -128,9 +119,6 @@ async def disapprove_pm(client, message: Message):
 
 
 # Set custom warning message
-@userbot.one.on_message(filters.command("setpmwarn", prefixes=".") & filters.me)
-@userbot.two.on_message(filters.command("setpmwarn", prefixes=".") & filters.me)
-@userbot.three.on_message(filters.command("setpmwarn", prefixes=".") & filters.me)
 async def set_pm_warn(client, message: Message):
     """Set custom PM warning message."""
     global CUSTOM_PM_WARN
@@ -152,9 +140,6 @@ async def set_pm_warn(client, message: Message):
 
 
 # Reset to default messages
-@userbot.one.on_message(filters.command("resetpm", prefixes=".") & filters.me)
-@userbot.two.on_message(filters.command("resetpm", prefixes=".") & filters.me)
-@userbot.three.on_message(filters.command("resetpm", prefixes=".") & filters.me)
 async def reset_pm_messages(client, message: Message):
     """Reset PM messages to default."""
     global CUSTOM_PM_WARN
@@ -168,9 +153,6 @@ async def reset_pm_messages(client, message: Message):
 
 
 # PMPermit help command
-@userbot.one.on_message(filters.command("pmhelp", prefixes=".") & filters.me)
-@userbot.two.on_message(filters.command("pmhelp", prefixes=".") & filters.me)
-@userbot.three.on_message(filters.command("pmhelp", prefixes=".") & filters.me)
 async def pm_auto_help(client, message: Message):
     """Show Auto Clear PM help."""
     help_text = (
@@ -188,3 +170,13 @@ async def pm_auto_help(client, message: Message):
     )
     
     await message.reply_text(help_text, parse_mode=enums.ParseMode.HTML)
+
+
+# Register the handlers on every assistant
+for ub in userbot.clients:
+    ub.on_message(filters.private & filters.incoming, group=1)(pm_auto_clear)
+    ub.on_message(filters.command("approve", prefixes=".") & filters.me)(approve_pm)
+    ub.on_message(filters.command("disapprove", prefixes=".") & filters.me)(disapprove_pm)
+    ub.on_message(filters.command("setpmwarn", prefixes=".") & filters.me)(set_pm_warn)
+    ub.on_message(filters.command("resetpm", prefixes=".") & filters.me)(reset_pm_messages)
+    ub.on_message(filters.command("pmhelp", prefixes=".") & filters.me)(pm_auto_help)
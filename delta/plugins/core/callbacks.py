@@ -111,8 +111,8 @@ async def _controls(_, query: types.CallbackQuery):
             pass
 
         msg = await app.send_message(chat_id=chat_id, text="Memutar lagu selanjutnya...")
-        if not media.file_path:
-            media.file_path = await yt.download(media.id, video=media.video)
+        if not await anon.ready(chat_id, media):
+            media.file_path = await yt.download(media.id, video=media.video, chat_id=chat_id)
         media.message_id = msg.id
         return await anon.play_media(chat_id, msg, media)
 
@@ -234,7 +234,7 @@ async def _help(_, query: types.CallbackQuery):
 
     # Help text mapping - hardcoded from id.json
     help_texts = {
-        "admins": "<u><b>Perintah admin:</b></u>\n\n/pause: Jeda streaming yang sedang berjalan.\n/resume: Lanjutkan streaming yang dijeda.\n/skip: Lewati streaming saat ini.\n/stop: Hentikan streaming yang sedang berjalan.\n\n/reload: Muat ulang cache admin.",
+        "admins": "<u><b>Perintah admin:</b></u>\n\n/pause: Jeda streaming yang sedang berjalan.\n/resume: Lanjutkan streaming yang dijeda.\n/skip: Lewati streaming saat ini.\n/stop: Hentikan streaming yang sedang berjalan.\n/radio [url]: Putar stream radio bersama.\n/radioleave: Hentikan radio.\n\n/reload: Muat ulang cache admin.",
         "auth": "<u><b>Perintah auth:</b></u>\n<i>Pengguna terotorisasi dapat mengontrol streaming tanpa menjadi admin.</i>\n\n/auth: Tambahkan pengguna ke daftar terotorisasi.\n/unauth: Hapus pengguna dari daftar terotorisasi.",
         "blist": "<u><b>Perintah blacklist:</b></u>\n<i>Chat dan pengguna yang di-blacklist tidak bisa menggunakan bot.</i>\n\n/blacklist [chat_id|user_id]: Tambahkan chat/pengguna ke blacklist.\n/unblacklist [chat_id|user_id]: Hapus chat/pengguna dari blacklist",
         "ping": "<u><b>Perintah ping:</b></u>\n\n/help: Menampilkan menu bantuan bot.\n\n/ping: Cek ping dan penggunaan memori bot.\n\n/start: Mulai bot.\n\n/sudolist: Menampilkan daftar pengguna sudo bot.",
@@ -276,12 +276,13 @@ async def player_settings_cmd(_, message: types.Message):
     chat_id = message.chat.id
     
     # Get current settings
-    loop_mode = await db.get_loop_mode(chat_id)
-    admin_only = await db.get_play_mode(chat_id)
-    cmd_delete = await db.get_cmd_delete(chat_id)
-    video_mode = await db.get_video_mode(chat_id)
-    video_quality = await db.get_video_quality(chat_id)
-    drama_mode = await db.get_drama_mode(chat_id)
+    settings = await db.get_settings(chat_id)
+    loop_mode = settings.loop_mode
+    admin_only = settings.admin_play
+    cmd_delete = settings.cmd_delete
+    video_mode = settings.video_mode
+    video_quality = settings.video_quality
+    drama_mode = settings.drama_mode
     
     # Format loop mode display
     loop_text = {
@@ -318,11 +319,13 @@ async def _player_settings_cb(_, query: types.CallbackQuery):
     await query.answer("Memproses...", show_alert=True)
 
     chat_id = query.message.chat.id
-    loop_mode = await db.get_loop_mode(chat_id)
-    admin_only = await db.get_play_mode(chat_id)
-    cmd_delete = await db.get_cmd_delete(chat_id)
-    video_mode = await db.get_video_mode(chat_id)
-    drama_mode = await db.get_drama_mode(chat_id)
+    settings = await db.get_settings(chat_id)
+    loop_mode = settings.loop_mode
+    admin_only = settings.admin_play
+    cmd_delete = settings.cmd_delete
+    video_mode = settings.video_mode
+    video_quality = settings.video_quality
+    drama_mode = settings.drama_mode
 
     if cmd[1] == "loop":
         # Cycle through loop modes
@@ -346,7 +349,6 @@ async def _player_settings_cb(_, query: types.CallbackQuery):
     elif cmd[1] == "quality":
         # Cycle through quality options
         qualities = ["360p", "480p", "720p", "1080p"]
-        video_quality = await db.get_video_quality(chat_id)
         current_idx = qualities.index(video_quality) if video_quality in qualities else 2
         new_quality = qualities[(current_idx + 1) % len(qualities)]
         await db.set_video_quality(chat_id, new_quality)
@@ -358,10 +360,6 @@ async def _player_settings_cb(_, query: types.CallbackQuery):
             pass
         return
     
-    # Get video quality if not already set
-    if 'video_quality' not in dir():
-        video_quality = await db.get_video_quality(chat_id)
-    
     # Format loop mode display
     loop_text = {
         "normal": "▶️ Normal",
@@ -8,7 +8,7 @@ import time
 
 from pyrogram import enums, errors, filters, types
 
-from delta import anon, app, config, db, queue, tasks, userbot, yt
+from delta import anon, app, config, db, queue, tasks, userbot
 from delta.helpers import buttons
 
 
@@ -46,10 +46,10 @@ async def auto_leave():
 async def track_time():
     while True:
         await asyncio.sleep(1)
-        for chat_id in await db.get_active_calls():
-            if not await db.playing(chat_id):
+        for call in db.active_calls.values():
+            if not call.playing:
                 continue
-            media = queue.get_current(chat_id)
+            media = queue.get_current(call.chat_id)
             if not media:
                 continue
             media.time += 1
@@ -71,11 +71,6 @@ async def update_timer(length=10):
                 pos = min(int((played / duration) * length), length - 1)
                 timer = "—" * pos + "◉" + "—" * (length - pos - 1)
 
-                if remaining <= 30:
-                    next = queue.get_next(chat_id, check=True)
-                    if next and not next.file_path:
-                        next.file_path = await yt.download(next.id, video=next.video)
-
                 if remaining < 10:
                     remove = True
                 else:
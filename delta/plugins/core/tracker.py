@@ -3,7 +3,7 @@
 # This file is part of AnonXMusic
 
 
-from pyrogram import filters, types
+from pyrogram import enums, filters, types
 
 from delta import app, db
 
@@ -20,3 +20,27 @@ async def track_users(_, m: types.Message):
     """Auto-track all users who message the bot."""
     if m.from_user and not await db.is_user(m.from_user.id):
         await db.add_user(m.from_user.id)
+
+
+@app.on_chat_member_updated(filters.group, group=1)
+async def track_admins(_, update: types.ChatMemberUpdated):
+    """Keep cached admin lists in sync with promotions and demotions."""
+    member = update.new_chat_member or update.old_chat_member
+    if not member or not member.user:
+        return
+
+    if member.user.id == app.id:
+        # Our own rights changed, refetch the whole list on next use.
+        db.admin_list.pop(update.chat.id)
+        return
+    if member.user.is_bot:
+        return
+
+    db.update_admin(
+        update.chat.id,
+        member.user.id,
+        bool(update.new_chat_member) and update.new_chat_member.status in (
+            enums.ChatMemberStatus.ADMINISTRATOR,
+            enums.ChatMemberStatus.OWNER,
+        ),
+    )
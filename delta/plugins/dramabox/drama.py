@@ -9,7 +9,8 @@ Command untuk mengakses konten DramaBox dari Telegram.
 """
 
 from pyrogram import enums, filters, types
-from delta import app, anon, db, queue
+from delta import app, anon, db, queue, yt
+from delta.core.downloads import Priority
 from delta.helpers import Media, is_admin, not_blacklisted
 from delta.helpers._graceful import with_flood_wait_handler
 from .api import dramabox, Drama, Episode
@@ -525,45 +526,46 @@ async def drama_download_callback(_, callback: types.CallbackQuery):
     
     try:
         # Download dari URL
-        async with aiohttp.ClientSession() as session:
-            async with session.get(video_url) as response:
-                if response.status != 200:
-                    raise Exception(f"HTTP {response.status}")
+        async with yt.scheduler.slot(Priority.USER, callback.message.chat.id):
+            async with aiohttp.ClientSession() as session:
+                async with session.get(video_url) as response:
+                    if response.status != 200:
+                        raise Exception(f"HTTP {response.status}")
                 
-                total_size = int(response.headers.get('content-length', 0))
-                downloaded = 0
+                    total_size = int(response.headers.get('content-length', 0))
+                    downloaded = 0
                 
 
-                last_update_time = 0
+                    last_update_time = 0
                 
-                with open(local_path, 'wb') as f:
-                    async for chunk in response.content.iter_chunked(1024 * 1024):  # 1MB chunks
-                        f.write(chunk)
-                        downloaded += len(chunk)
+                    with open(local_path, 'wb') as f:
+                        async for chunk in response.content.iter_chunked(1024 * 1024):  # 1MB chunks
+                            f.write(chunk)
+                            downloaded += len(chunk)
                         
-                        # Update progress every 4 seconds (to avoid FloodWait)
-                        now = time.time()
-                        if (now - last_update_time > 4) and (downloaded % (5 * 1024 * 1024) < 1024 * 1024):
-                            progress = (downloaded / total_size * 100) if total_size > 0 else 0
-                            size_mb = downloaded / (1024 * 1024)
-                            total_mb = total_size / (1024 * 1024)
-                            try:
-                                await msg.edit_text(
-                                    f"⬇️ <b>Sedang Mengunduh</b>\n\n"
-                                    f"<blockquote>"
-                                    f"🎬 {drama_title}\n"
-                                    f"📺 {episode.chapter_name}\n"
-                                    f"💿 {quality}\n\n"
-                                    f"📊 Progress: <code>{progress:.1f}%</code>\n"
-                                    f"📦 Size: <code>{size_mb:.1f} MB / {total_mb:.1f} MB</code>"
-                                    f"</blockquote>",
-                                    parse_mode=enums.ParseMode.HTML
-                                )
-                                last_update_time = now
-                            except FloodWait as e:
-                                await asyncio.sleep(e.value)
-                            except:
-                                pass
+                            # Update progress every 4 seconds (to avoid FloodWait)
+                            now = time.time()
+                            if (now - last_update_time > 4) and (downloaded % (5 * 1024 * 1024) < 1024 * 1024):
+                                progress = (downloaded / total_size * 100) if total_size > 0 else 0
+                                size_mb = downloaded / (1024 * 1024)
+                                total_mb = total_size / (1024 * 1024)
+                                try:
+                                    await msg.edit_text(
+                                        f"⬇️ <b>Sedang Mengunduh</b>\n\n"
+                                        f"<blockquote>"
+                                        f"🎬 {drama_title}\n"
+                                        f"📺 {episode.chapter_name}\n"
+                                        f"💿 {quality}\n\n"
+                                        f"📊 Progress: <code>{progress:.1f}%</code>\n"
+                                        f"📦 Size: <code>{size_mb:.1f} MB / {total_mb:.1f} MB</code>"
+                                        f"</blockquote>",
+                                        parse_mode=enums.ParseMode.HTML
+                                    )
+                                    last_update_time = now
+                                except FloodWait as e:
+                                    await asyncio.sleep(e.value)
+                                except:
+                                    pass
         
         # Upload ke Telegram
         await msg.edit_text(
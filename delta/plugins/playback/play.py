@@ -4,6 +4,7 @@
 
 
 from pathlib import Path
+from time import monotonic
 
 from pyrogram import enums, filters, types
 
@@ -34,6 +35,7 @@ async def play_hndlr(
     video: bool = False,
     url: str = None,
 ) -> None:
+    started = monotonic()
     # Add reaction to the message
     try:
         import random
@@ -158,15 +160,17 @@ async def play_hndlr(
                 await utils.auto_delete(playlist_msg)
             return
 
+    downloaded = False
     if not file.file_path:
         fname = f"downloads/{file.id}.{'mp4' if video else 'webm'}"
         if Path(fname).exists():
             file.file_path = fname
-        else:
+        elif not await anon.ready(m.chat.id, file):
             await sent.edit_text("⏳ <b>Sedang memproses, harap tunggu...</b>", parse_mode=enums.ParseMode.HTML)
-            file.file_path = await yt.download(file.id, video=video)
+            file.file_path = await yt.download(file.id, video=video, chat_id=m.chat.id)
+            downloaded = True
 
-    await anon.play_media(chat_id=m.chat.id, message=sent, media=file)
+    await anon.play_media(chat_id=m.chat.id, message=sent, media=file, started=started, downloaded=downloaded)
     if not tracks:
         return
     added = playlist_to_queue(m.chat.id, tracks)
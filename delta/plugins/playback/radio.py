@@ -0,0 +1,73 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+
+import html
+
+from pyrogram import enums, filters, types
+
+from delta import anon, app, radio
+from delta.core.radio import valid_url
+from delta.helpers import admin_check, not_blacklisted
+from delta.helpers._play import join_assistant
+
+
+@app.on_message(filters.command(["radio"]) & filters.group & not_blacklisted)
+@admin_check
+async def radio_join(_, m: types.Message) -> None:
+    """
+    Tune the voice chat in to a shared radio stream
+
+    Usage: /radio [stream url]
+    """
+    if len(m.command) > 1:
+        url = m.command[1]
+    elif m.reply_to_message and (m.reply_to_message.text or m.reply_to_message.caption):
+        url = (m.reply_to_message.text or m.reply_to_message.caption).split()[0]
+    else:
+        url = None
+    if not url or not valid_url(url):
+        return await m.reply_text(
+            "ℹ️ <b>Penggunaan:</b>\n\n<blockquote><code>/radio [url]</code>\n\n"
+            "Hanya URL http(s) atau rtmp(s) publik yang didukung.</blockquote>",
+            parse_mode=enums.ParseMode.HTML
+        )
+    if await join_assistant(m):
+        return
+
+    sent = await m.reply_text("📻 <b>Menyambungkan radio...</b>", parse_mode=enums.ParseMode.HTML)
+    try:
+        station = await radio.join(m.chat.id, url)
+    except Exception as e:
+        return await sent.edit_text(
+            f"❌ <b>Radio Gagal Diputar</b>\n\n<blockquote>{type(e).__name__}: {html.escape(str(e))}</blockquote>",
+            parse_mode=enums.ParseMode.HTML
+        )
+    await sent.edit_text(
+        f"📻 <b>Radio Diputar</b>\n\n"
+        f"<blockquote><b>Sumber:</b> <code>{html.escape(url)}</code>\n"
+        f"<b>Pendengar:</b> {len(station.listeners)} chat\n"
+        f"<b>Diminta oleh:</b> {m.from_user.mention}</blockquote>",
+        parse_mode=enums.ParseMode.HTML
+    )
+
+
+@app.on_message(filters.command(["radioleave", "radiostop"]) & filters.group & not_blacklisted)
+@admin_check
+async def radio_leave(_, message: types.Message):
+    """
+    Stop the radio stream of this chat
+
+    Usage: /radioleave
+    """
+    if not radio.station(message.chat.id):
+        return await message.reply_text(
+            "❌ <b>Radio tidak diputar</b>\n\n<blockquote>Gunakan /radio [url] untuk memutar radio</blockquote>",
+            parse_mode=enums.ParseMode.HTML
+        )
+    await anon.stop(message.chat.id)
+    await message.reply_text(
+        f"⏹ <b>Radio Dihentikan</b>\n\n<blockquote>{message.from_user.mention} menghentikan radio</blockquote>",
+        parse_mode=enums.ParseMode.HTML
+    )
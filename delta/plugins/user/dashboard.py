@@ -12,16 +12,6 @@ from delta import app, config, logger
 from delta.helpers import not_blacklisted
 
 
-# Custom sudo filter that checks at runtime
-def sudo_filter(_, __, message):
-    """Runtime check for sudo users"""
-    if not message.from_user:
-        return False
-    return message.from_user.id in app.sudoers or message.from_user.id == config.OWNER_ID
-
-sudo_users_filter = filters.create(sudo_filter)
-
-
 @app.on_message(filters.command(["dashboard"]) & not_blacklisted)
 async def dashboard_command(_, message: types.Message):
     """
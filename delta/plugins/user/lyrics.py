@@ -4,20 +4,10 @@
 
 from pyrogram import enums, filters, types
 
-from delta import app, config, queue
+from delta import app, queue
 from delta.helpers._decorators import command_limiter, require_rate_limit, safe_execute
 from delta.helpers._lyrics import lyrics_searcher
-from delta.helpers import not_blacklisted
-
-
-# Custom sudo filter that checks at runtime
-def sudo_filter(_, __, message):
-    """Runtime check for sudo users"""
-    if not message.from_user:
-        return False
-    return message.from_user.id in app.sudoers or message.from_user.id == config.OWNER_ID
-
-sudo_users_filter = filters.create(sudo_filter)
+from delta.helpers import not_blacklisted, sudo_users_filter
 
 
 @app.on_message(
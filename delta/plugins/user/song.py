@@ -6,6 +6,7 @@
 from pyrogram import enums, filters, types
 
 from delta import app, config, yt
+from delta.core.downloads import Priority
 from delta.helpers import not_blacklisted
 
 
@@ -37,9 +38,7 @@ async def song_command(_, message: types.Message):
             parse_mode=enums.ParseMode.HTML
         )
         
-        import yt_dlp
         import os
-        import asyncio
         import re
         
         yturl = f"https://www.youtube.com/watch?v={track.id}"
@@ -69,11 +68,8 @@ async def song_command(_, message: types.Message):
             }],
         }
         
-        def _download():
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.extract_info(yturl, download=True)
-        
-        await asyncio.to_thread(_download)
+        async with yt.scheduler.slot(Priority.USER, message.chat.id):
+            await yt.pool.run("download", yturl, ydl_opts)
         
         # File will be .mp3 after conversion
         file_path = f"downloads/{safe_title}.mp3"
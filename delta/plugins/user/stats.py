@@ -62,11 +62,9 @@ async def stats_command(_, m: types.Message):
              pass
     
     # Get group ranking
-    all_groups = await db.get_top_chats(limit=1000)
+    rank_position, total_groups = await db.get_chat_rank(chat_id)
     group_rank = "N/A"
-    if chat_id in all_groups:
-        rank_position = list(all_groups.keys()).index(chat_id) + 1
-        total_groups = len(all_groups)
+    if rank_position:
         group_rank = f"#{rank_position} dari {total_groups}"
     
     caption = f"""📊 <b>Statistik {m.chat.title}</b>
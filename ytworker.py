@@ -0,0 +1,65 @@
+# Copyright (c) 2025 AnonymousX1025
+# Licensed under the MIT License.
+# This file is part of AnonXMusic
+
+"""
+Entry point of the yt-dlp worker processes.
+
+Kept outside the delta package and free of bot imports: the workers are
+started from a fork server that imports only this module and yt_dlp, so
+they never inherit the bot's threads, sockets or locks.
+"""
+
+import json
+import signal
+from collections import OrderedDict
+
+import yt_dlp
+
+# Warm YoutubeDL instances kept per worker, one per distinct option set.
+MAX_INSTANCES = 8
+
+
+def execute(ydl, kind: str, url: str):
+    if kind == "extract":
+        return ydl.sanitize_info(ydl.extract_info(url, download=False))
+    if kind == "download":
+        return ydl.download([url])
+    raise ValueError(f"Unknown job kind: {kind}")
+
+
+def main(conn) -> None:
+    """Worker process loop: run jobs from `conn` on warm YoutubeDL instances."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    instances: OrderedDict[str, yt_dlp.YoutubeDL] = OrderedDict()
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+
+        job_id, kind, url, opts = job
+        # The output path changes with every download, so it is set per job
+        # instead of being part of the instance key.
+        opts = dict(opts)
+        outtmpl = opts.pop("outtmpl", None)
+        key = json.dumps(opts, sort_keys=True, default=str)
+        try:
+            ydl = instances.pop(key, None) or yt_dlp.YoutubeDL(opts)
+            instances[key] = ydl
+            while len(instances) > MAX_INSTANCES:
+                instances.popitem(last=False)[1].close()
+            if outtmpl:
+                ydl.params["outtmpl"]["default"] = outtmpl
+            message = (job_id, True, execute(ydl, kind, url))
+        except Exception as e:
+            message = (job_id, False, (type(e).__name__, str(e)))
+
+        try:
+            conn.send(message)
+        except (EOFError, OSError):
+            return
+        except Exception as e:
+            conn.send((job_id, False, (type(e).__name__, f"Unserializable result: {e}")))